@@ -0,0 +1,80 @@
+from typing import Dict, Iterable, List, Sequence
+import glob
+import os
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Convert to naive UTC, matching BigQuery's DATE(); naive values are taken as UTC."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+class DailyAggregateState:
+    """Per-day partial aggregates persisted as one Parquet file per day.
+
+    A day's partials are only stored once the day lies wholly inside a
+    requested window and ended at least ``lag`` ago, which leaves time for
+    late-arriving rows to land, so stored days never change. Aggregates for a
+    window are rebuilt by folding the stored days with freshly computed ones:
+    counts and sums are added and last-seen timestamps take the maximum. The
+    result is identical to aggregating the whole window from scratch.
+    """
+
+    def __init__(self, root: str, name: str, lag: timedelta = timedelta(hours=6)):
+        self.path = os.path.join(root, name)
+        self.lag = lag
+
+    def days(self) -> List[str]:
+        return sorted(
+            os.path.basename(path)[len("day="):-len(".parquet")]
+            for path in glob.glob(os.path.join(self.path, "day=*.parquet"))
+        )
+
+    def write_day(self, day: str, partials: pd.DataFrame):
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path, f"day={day}.parquet")
+        tmp_path = f"{path}.tmp"
+        partials.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def read_days(self, days: Iterable[str]) -> pd.DataFrame:
+        frames = [
+            pd.read_parquet(os.path.join(self.path, f"day={day}.parquet"))
+            for day in days
+        ]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def window_days(self, start: datetime, end: datetime) -> Dict[str, bool]:
+        """Map each UTC day touched by ``[start, end]`` to whether it can be stored.
+
+        A day can be stored when the window covers all of it and it ended at
+        least ``lag`` ago.
+        """
+        start, end = to_naive_utc(start), to_naive_utc(end)
+
+        now = datetime.utcnow()
+        days = {}
+        day = datetime(start.year, start.month, start.day)
+        while day <= end:
+            day_end = day + timedelta(days=1)
+            days[day.strftime("%Y-%m-%d")] = (
+                start <= day and day_end <= end and day_end + self.lag <= now
+            )
+            day = day_end
+        return days
+
+    @staticmethod
+    def fold(
+        partials: pd.DataFrame,
+        keys: Sequence[str],
+        sums: Sequence[str] = (),
+        maxes: Sequence[str] = ()
+    ) -> pd.DataFrame:
+        """Combine partial aggregates into one row per key."""
+        if partials.empty:
+            return pd.DataFrame(columns=[*keys, *sums, *maxes])
+        return partials.groupby(list(keys), as_index=False, sort=False).agg({
+            **{column: "sum" for column in sums},
+            **{column: "max" for column in maxes}
+        })
@@ -0,0 +1,172 @@
+from typing import Optional, Sequence, Tuple
+import numpy as np
+
+class IVFIndex:
+    """Inverted-file approximate nearest neighbour index over product embeddings.
+
+    Vectors are L2-normalised so inner product equals cosine similarity. The
+    catalog is partitioned by a k-means coarse quantizer; a query only scans
+    the ``n_probe`` partitions whose centroids are closest to it.
+    """
+
+    def __init__(self, dim: int, n_lists: int = 1024, n_probe: int = 16):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.centroids: Optional[np.ndarray] = None
+
+        # Vectors and ids are stored grouped by list, with CSR-style offsets
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.ids = np.empty(0, dtype=str)
+        self.list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        n_lists: Optional[int] = None,
+        n_probe: int = 16,
+        n_iter: int = 20,
+        sample_size: int = 100_000,
+        seed: int = 0
+    ) -> "IVFIndex":
+        """Train the coarse quantizer on ``vectors`` and index all of them."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if n_lists is None:
+            # sqrt(N) lists keeps both the centroid scan and list scans small
+            n_lists = max(1, int(np.sqrt(len(vectors))))
+
+        index = cls(vectors.shape[1], n_lists=n_lists, n_probe=n_probe)
+        index.train(vectors, n_iter=n_iter, sample_size=sample_size, seed=seed)
+        index.add(ids, vectors)
+        return index
+
+    def train(
+        self,
+        vectors: np.ndarray,
+        n_iter: int = 20,
+        sample_size: int = 100_000,
+        seed: int = 0
+    ):
+        """Fit list centroids with spherical k-means on a sample of vectors."""
+        rng = np.random.default_rng(seed)
+        data = self._normalize(vectors)
+        if len(data) > sample_size:
+            data = data[rng.choice(len(data), sample_size, replace=False)]
+
+        n_lists = min(self.n_lists, len(data))
+        centroids = data[rng.choice(len(data), n_lists, replace=False)].copy()
+
+        for _ in range(n_iter):
+            assignments = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, data)
+            counts = np.bincount(assignments, minlength=n_lists)
+
+            # Re-seed empty lists with random points so no centroid is wasted
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+            centroids = self._normalize(sums)
+
+        self.n_lists = n_lists
+        self.centroids = centroids
+        self.list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray):
+        """Add vectors to the index, keeping storage grouped by list."""
+        if not self.is_trained:
+            raise ValueError("IVFIndex must be trained before adding vectors")
+
+        vectors = self._normalize(vectors)
+        ids = np.asarray(ids, dtype=str)
+
+        all_vectors = np.concatenate([self.vectors, vectors])
+        all_ids = np.concatenate([self.ids, ids])
+        assignments = np.argmax(all_vectors @ self.centroids.T, axis=1)
+
+        order = np.argsort(assignments, kind="stable")
+        self.vectors = np.ascontiguousarray(all_vectors[order])
+        self.ids = all_ids[order]
+        self.list_offsets = np.concatenate([
+            [0],
+            np.cumsum(np.bincount(assignments, minlength=self.n_lists))
+        ]).astype(np.int64)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        n_probe: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ids and cosine scores of the approximate top ``k`` neighbours."""
+        if not self.is_trained or len(self) == 0:
+            return np.empty(0, dtype=str), np.empty(0, dtype=np.float32)
+
+        query = self._normalize(np.asarray(query).reshape(1, -1))[0]
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+
+        # Pick the closest lists without sorting every centroid
+        centroid_scores = self.centroids @ query
+        probe = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+
+        rows = np.concatenate([
+            np.arange(self.list_offsets[i], self.list_offsets[i + 1])
+            for i in probe
+        ])
+        if len(rows) == 0:
+            return np.empty(0, dtype=str), np.empty(0, dtype=np.float32)
+
+        scores = self.vectors[rows] @ query
+        k = min(k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return self.ids[rows[top]], scores[top]
+
+    def save(self, path: str):
+        """Persist the index to a single ``.npz`` file."""
+        if not self.is_trained:
+            raise ValueError("Cannot save an untrained IVFIndex")
+
+        # Write through a file handle so numpy doesn't append a suffix
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                vectors=self.vectors,
+                ids=self.ids,
+                list_offsets=self.list_offsets,
+                n_probe=np.array(self.n_probe)
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """Load an index previously written by ``save``."""
+        with np.load(path, allow_pickle=False) as data:
+            centroids = data["centroids"]
+            index = cls(
+                centroids.shape[1],
+                n_lists=len(centroids),
+                n_probe=int(data["n_probe"])
+            )
+            index.centroids = centroids
+            index.vectors = data["vectors"]
+            index.ids = data["ids"]
+            index.list_offsets = data["list_offsets"]
+
+        return index
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
@@ -0,0 +1,135 @@
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+import asyncio
+import time
+from datetime import datetime
+import numpy as np
+
+@dataclass
+class _PendingRequest:
+    inputs: List[np.ndarray]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.inputs[0])
+
+class MicroBatcher:
+    """Coalesces concurrent inference calls into batched forward passes.
+
+    Callers ``await predict(*inputs)`` with one or more row-aligned input
+    arrays. A background task collects requests for up to ``max_wait_ms`` or
+    until ``max_batch_size`` rows are queued, runs ``predict_fn`` once on the
+    concatenated inputs in a worker thread and hands each caller back its own
+    slice of the output.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[np.ndarray]], np.ndarray],
+        name: str,
+        max_batch_size: int = 256,
+        max_wait_ms: float = 2.0,
+        monitoring=None
+    ):
+        self.predict_fn = predict_fn
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.monitoring = monitoring
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def predict(self, *inputs: np.ndarray) -> np.ndarray:
+        """Queue rows for the next batch and wait for their predictions."""
+        self._ensure_worker()
+
+        request = _PendingRequest(
+            inputs=[np.asarray(x) for x in inputs],
+            future=asyncio.get_running_loop().create_future()
+        )
+        await self._queue.put(request)
+
+        return await request.future
+
+    async def close(self):
+        """Stop the background worker once queued requests are served."""
+        if self._worker is None:
+            return
+
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._queue = None
+
+    def _ensure_worker(self):
+        # Keep an existing queue so requests already in it are still served
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            n_rows = batch[0].n_rows
+            deadline = loop.time() + self.max_wait
+
+            # Keep collecting until the batch is full or the window closes
+            while n_rows < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(request)
+                n_rows += request.n_rows
+
+            try:
+                await self._process(batch, n_rows)
+            except Exception as e:
+                # A bad batch fails its callers but never the worker
+                self._fail(batch, e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _fail(self, batch: List[_PendingRequest], error: Exception):
+        for request in batch:
+            if not request.future.done():
+                request.future.set_exception(error)
+
+    async def _process(self, batch: List[_PendingRequest], n_rows: int):
+        started_at = time.perf_counter()
+        inputs = [
+            np.concatenate([request.inputs[i] for request in batch])
+            for i in range(len(batch[0].inputs))
+        ]
+        outputs = np.asarray(await asyncio.to_thread(self.predict_fn, inputs))
+
+        offset = 0
+        for request in batch:
+            if not request.future.done():
+                request.future.set_result(outputs[offset:offset + request.n_rows])
+            offset += request.n_rows
+
+        if self.monitoring is not None:
+            queue_delays = [started_at - request.enqueued_at for request in batch]
+            await self.monitoring.log_metrics({
+                "inference_batcher": self.name,
+                "batch_size": n_rows,
+                "batch_requests": len(batch),
+                "queue_delay_mean": float(np.mean(queue_delays)),
+                "queue_delay_max": float(np.max(queue_delays)),
+                "inference_latency": time.perf_counter() - started_at,
+                "timestamp": datetime.now().isoformat()
+            })
@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+@dataclass
+class CandidateBatch:
+    """Columnar candidate set: one NumPy array per product column.
+
+    Scoring reads feature columns straight into a float32 matrix; per-product
+    dicts are only built for the rows that are actually returned.
+    """
+    columns: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Sequence[Dict],
+        columns: Optional[Sequence[str]] = None
+    ) -> "CandidateBatch":
+        """Build a batch from product dicts, keeping only ``columns`` if given."""
+        if columns is None:
+            columns = list(records[0]) if records else []
+        return cls({
+            column: np.asarray([record[column] for record in records])
+            for column in columns
+        })
+
+    @classmethod
+    def from_arrow(cls, record_batch) -> "CandidateBatch":
+        """Build a batch from a ``pyarrow.RecordBatch`` or ``Table``."""
+        return cls({
+            name: record_batch.column(i).to_numpy(zero_copy_only=False)
+            for i, name in enumerate(record_batch.schema.names)
+        })
+
+    def feature_matrix(
+        self,
+        features: Sequence[str],
+        start: int = 0,
+        stop: Optional[int] = None
+    ) -> np.ndarray:
+        """Stack feature columns for rows ``start:stop`` into a float32 matrix."""
+        return np.ascontiguousarray(
+            np.column_stack([self.columns[f][start:stop] for f in features]),
+            dtype=np.float32
+        )
+
+    def to_records(self, indices: Sequence[int]) -> List[Dict]:
+        """Materialise product dicts for the selected rows only."""
+        selected = {
+            name: values[np.asarray(indices)]
+            for name, values in self.columns.items()
+        }
+        return [
+            {
+                name: _to_python(values[i])
+                for name, values in selected.items()
+            }
+            for i in range(len(indices))
+        ]
+
+def _to_python(value):
+    """Unwrap NumPy scalars so records hold plain Python values."""
+    return value.item() if isinstance(value, np.generic) else value
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import os
 
 @dataclass
@@ -15,6 +15,12 @@ class RecommenderConfig(ModelConfig):
     num_layers: int = 2
     learning_rate: float = 0.001
     batch_size: int = 64
+    top_k: int = 10
+    scoring_chunk_size: int = 65536
+    inference_mode: str = 'vertex'  # 'vertex' or 'local'
+    local_model_path: Optional[str] = None
+    product_embedding_cache_path: Optional[str] = None
+    product_embedding_cache_dtype: str = 'float32'
     
 @dataclass
 class PricingConfig(ModelConfig):
@@ -22,6 +28,16 @@ class PricingConfig(ModelConfig):
     action_dim: int = 100
     hidden_dim: int = 256
     gamma: float = 0.99
+    replay_capacity: int = 100000
+    prioritized_replay: bool = False
+    per_alpha: float = 0.6
+    per_beta: float = 0.4
+    training_mode: str = 'vertex'  # 'vertex' or 'local'
+    local_workers: int = 4
+    rollout_products: int = 256
+    rollout_steps: int = 16
+    updates_per_rollout: int = 8
+    local_training_rollouts: int = 1000
     
 @dataclass
 class MLConfig:
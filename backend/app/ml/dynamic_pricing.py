@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import GradientBoostingRegressor
@@ -9,6 +9,13 @@ import asyncio
 from google.cloud import bigquery
 from ..monitoring import MonitoringService
 from ..database import AsyncDatabase
+from .batching import MicroBatcher
+from .inference import CompiledModel
+from .ttl_cache import TTLCache
+from .log_sink import BatchedLogSink
+from .price_table import PriceTable
+from .pricing_rules import CompiledPricingRules
+from .tree_export import FlatTreeEnsemble
 
 class DynamicPricingEngine:
     def __init__(self, config: Dict):
@@ -20,8 +27,71 @@ class DynamicPricingEngine:
         # Initialize models
         self.demand_model = self._build_demand_model()
         self.elasticity_model = self._build_elasticity_model()
+        self.elasticity_fn: Optional[FlatTreeEnsemble] = None
         self.price_optimizer = self._build_price_optimizer()
         self.scaler = StandardScaler()
+        
+        # Pricing decisions are written to BigQuery in the background
+        decisions_table = f"{self.config['project_id']}.pricing_decisions"
+        self.decision_sink = BatchedLogSink(
+            lambda rows: self.bq_client.insert_rows_json(decisions_table, rows),
+            name="pricing_decisions",
+            max_batch_size=self.config.get("decision_log_batch_size", 500),
+            flush_interval=self.config.get("decision_log_flush_seconds", 1.0),
+            max_buffer=self.config.get("decision_log_max_buffer", 50000),
+            spool_path=self.config.get("decision_log_spool_path"),
+            dead_letter_path=self.config.get("decision_log_dead_letter_path"),
+            max_replay_rows=self.config.get("decision_log_max_replay_rows", 10000),
+            max_replay_attempts=self.config.get("decision_log_max_replay_attempts", 5),
+            monitoring=self.monitoring
+        )
+        
+        # Pricing rules and constraints, compiled into arrays on first use
+        self.pricing_rules: Optional[CompiledPricingRules] = None
+        self._pricing_rules_stale = False
+        self._pricing_rules_lock: Optional[asyncio.Lock] = None
+        
+        # Precomputed prices served until they expire
+        self.price_table = PriceTable()
+        
+        # Short-lived cache for slow-moving pricing inputs
+        self.feature_cache = TTLCache(
+            ttl_seconds=self.config.get("feature_cache_ttl_seconds", 300),
+            max_entries=self.config.get("feature_cache_max_entries", 100_000)
+        )
+        
+        # NumPy forward passes for the small pricing MLPs
+        self.demand_fn = CompiledModel(self.demand_model)
+        self.actor_fn = CompiledModel(self.price_optimizer["actor"])
+        
+        # Coalesce concurrent predictions into batched calls unless disabled
+        self.demand_batcher = self._build_batcher(
+            "demand", lambda inputs: self.demand_fn(inputs[0])
+        )
+        self.actor_batcher = self._build_batcher(
+            "price_actor", lambda inputs: self.actor_fn(inputs[0])
+        )
+
+    def _build_batcher(self, name: str, predict_fn) -> MicroBatcher:
+        """Create an inference micro-batcher configured from engine settings."""
+        return MicroBatcher(
+            predict_fn,
+            name=name,
+            max_batch_size=self.config.get("inference_batch_size", 256),
+            max_wait_ms=self.config.get("inference_max_wait_ms", 2.0),
+            monitoring=self.monitoring
+        )
+
+    async def _run_inference(
+        self,
+        model: CompiledModel,
+        batcher: MicroBatcher,
+        X: np.ndarray
+    ) -> np.ndarray:
+        """Run a forward pass, through the micro-batcher if batching is enabled."""
+        if self.config.get("inference_batching", True):
+            return await batcher.predict(X)
+        return model(X)
 
     def _build_demand_model(self) -> tf.keras.Model:
         """Build deep learning model for demand prediction."""
@@ -78,6 +148,13 @@ class DynamicPricingEngine:
         try:
             start_time = datetime.now()
             
+            # Serve from the precomputed table while the price is still valid
+            segment = self._get_price_segment(user_id, context)
+            if segment is not None:
+                cached_price = self.price_table.lookup(product_id, segment)
+                if cached_price is not None:
+                    return cached_price
+            
             # Get base features
             features = await self._get_pricing_features(product_id, user_id, context)
             
@@ -129,30 +206,238 @@ class DynamicPricingEngine:
             })
             raise
 
-    async def _get_pricing_features(
+    async def get_optimal_prices(
         self,
-        product_id: str,
+        product_ids: List[str],
+        user_id: Optional[str] = None,
+        context: Optional[Dict] = None
+    ) -> Dict[str, Dict]:
+        """Get optimal prices for many products in vectorised batches."""
+        try:
+            batch_size = self.config.get("bulk_pricing_batch_size", 10000)
+            prices = {}
+            for i in range(0, len(product_ids), batch_size):
+                prices.update(await self._price_batch(
+                    product_ids[i:i + batch_size],
+                    user_id,
+                    context
+                ))
+            return prices
+        except Exception as e:
+            await self.monitoring.log_error(e, {
+                "service": "dynamic_pricing",
+                "operation": "get_optimal_prices",
+                "product_count": len(product_ids)
+            })
+            raise
+
+    async def _price_batch(
+        self,
+        product_ids: List[str],
         user_id: Optional[str],
         context: Optional[Dict]
-    ) -> Dict:
-        """Get features for pricing decisions."""
-        # Get product data
-        product_data = await self.db.get_product_data(product_id)
+    ) -> Dict[str, Dict]:
+        """Price one batch of products with a single pass through each model."""
+        start_time = datetime.now()
+        
+        # Get base features, competitor prices and constraints with set-based lookups
+        features, competitor_prices, rules = await asyncio.gather(
+            self._get_pricing_features_many(product_ids, user_id, context),
+            self.db.get_competitor_prices_many(product_ids),
+            self._get_compiled_rules(product_ids)
+        )
+        
+        # Skip products missing from a bulk lookup instead of failing the batch
+        missing = [
+            product_id for product_id in product_ids
+            if product_id not in features
+            or product_id not in competitor_prices
+            or product_id not in rules
+        ]
+        if missing:
+            await self.monitoring.log_metrics({
+                "pricing_skipped_products": len(missing),
+                "pricing_skipped_product_ids": missing[:100],
+                "timestamp": datetime.now().isoformat()
+            })
+            skipped = set(missing)
+            product_ids = [p for p in product_ids if p not in skipped]
+            if not product_ids:
+                return {}
+        features = [features[product_id] for product_id in product_ids]
+        
+        # Predict demand for the whole batch
+        X = np.vstack([self._prepare_features_for_demand(f) for f in features])
+        predicted_demand = self.demand_fn(self.scaler.transform(X))[:, 0]
+        
+        # Calculate price elasticity for the whole batch
+        X = np.vstack([self._prepare_features_for_elasticity(f) for f in features])
+        elasticity = self._predict_elasticity(X)
+        
+        # Run the actor network once over all states
+        states = np.vstack([
+            self._prepare_state(
+                f,
+                predicted_demand[i],
+                elasticity[i],
+                competitor_prices[product_id]
+            )
+            for i, (product_id, f) in enumerate(zip(product_ids, features))
+        ])
+        actions = self.actor_fn(states)[:, 0]
+        
+        # Convert actions to prices
+        base_prices = np.array([f["product_data"]["base_price"] for f in features])
+        price_ranges = np.array([f["product_data"]["price_range"] for f in features])
+        optimal_prices = base_prices * (1 + (actions - 0.5) * price_ranges)
+        
+        # Apply business rules and constraints
+        final_prices = await self._apply_pricing_rules_batch(
+            product_ids,
+            optimal_prices,
+            user_id,
+            context
+        )
+        
+        # Log all pricing decisions together
+        await self._log_pricing_decisions(
+            product_ids,
+            final_prices,
+            features,
+            start_time
+        )
+        
+        return final_prices
+
+    async def refresh_price_table(
+        self,
+        product_ids: List[str],
+        segments: Sequence[str] = ("default",)
+    ):
+        """Recompute prices for every product and segment and swap them in."""
+        start_time = datetime.now()
+        
+        entries = {}
+        for segment in segments:
+            prices = await self.get_optimal_prices(
+                product_ids, context={"segment": segment}
+            )
+            for product_id, price in prices.items():
+                entries[(product_id, segment)] = price
         
-        # Get historical sales data
-        sales_data = await self._get_historical_sales(product_id)
+        self.price_table.swap(entries)
+        
+        await self.monitoring.log_metrics({
+            "price_table_size": len(entries),
+            "price_table_build_time": (datetime.now() - start_time).total_seconds(),
+            "timestamp": datetime.now().isoformat()
+        })
+
+    async def schedule_price_table_refresh(
+        self,
+        get_product_ids,
+        segments: Sequence[str] = ("default",)
+    ):
+        """Rebuild the price table periodically, before entries expire."""
+        # Default to rebuilding at half the validity window
+        interval = self.config.get(
+            "price_table_refresh_seconds",
+            self.config["price_validity_hours"] * 3600 / 2
+        )
+        while True:
+            # A failed rebuild keeps the previous table and retries next interval
+            try:
+                product_ids = await get_product_ids()
+                await self.refresh_price_table(product_ids, segments)
+            except Exception as e:
+                await self.monitoring.log_error(e, {
+                    "service": "dynamic_pricing",
+                    "operation": "schedule_price_table_refresh"
+                })
+            await asyncio.sleep(interval)
+
+    def _get_price_segment(
+        self,
+        user_id: Optional[str],
+        context: Optional[Dict]
+    ) -> Optional[str]:
+        """Price table segment for a request, or None if it must be priced live."""
+        # Identified users may have personal pricing rules
+        if user_id:
+            return None
         
-        # Get market data
-        market_data = await self._get_market_data(product_id)
+        # The table is keyed by segment only; any other context can change
+        # the price, so it has to be computed live
+        if context and set(context) - {"segment"}:
+            return None
         
-        # Get inventory data
-        inventory_data = await self._get_inventory_data(product_id)
+        if context and context.get("segment"):
+            return context["segment"]
+        return "default"
+
+    async def _get_pricing_features_many(
+        self,
+        product_ids: List[str],
+        user_id: Optional[str],
+        context: Optional[Dict]
+    ) -> Dict[str, Dict]:
+        """Get pricing features for many products with one query per source.
+
+        Products with no product data are left out of the result.
+        """
+        product_data, sales_data, market_data, inventory_data = await asyncio.gather(
+            self.db.get_product_data_many(product_ids),
+            self.db.get_historical_sales_many(product_ids),
+            self.db.get_market_data_many(product_ids),
+            self.db.get_inventory_data_many(product_ids)
+        )
         
-        # Get user segment data if available
+        # User and seasonal data are shared by every product in the batch
         user_data = await self._get_user_data(user_id) if user_id else None
+        seasonal_factors = self._calculate_seasonal_factors()
+        
+        return {
+            product_id: {
+                "product_data": product_data[product_id],
+                "sales_data": sales_data.get(product_id),
+                "market_data": market_data.get(product_id),
+                "inventory_data": inventory_data.get(product_id),
+                "user_data": user_data,
+                "seasonal_factors": seasonal_factors,
+                "context": context
+            }
+            for product_id in product_ids
+            if product_data.get(product_id) is not None
+        }
+
+    async def _get_pricing_features(
+        self,
+        product_id: str,
+        user_id: Optional[str],
+        context: Optional[Dict]
+    ) -> Dict:
+        """Get features for pricing decisions."""
+        # Fetch all sources concurrently; historical sales and market data
+        # are slow-moving and served from a short-TTL cache
+        (
+            product_data,
+            sales_data,
+            market_data,
+            inventory_data,
+            user_data
+        ) = await asyncio.gather(
+            self.db.get_product_data(product_id),
+            self._get_cached("sales_data", product_id, self._get_historical_sales),
+            self._get_cached("market_data", product_id, self._get_market_data),
+            self._get_inventory_data(product_id),
+            self._get_user_data(user_id) if user_id else asyncio.sleep(0, result=None)
+        )
         
         # Get seasonal factors
-        seasonal_factors = self._calculate_seasonal_factors()
+        seasonal_factors = self.feature_cache.get(("seasonal_factors", None))
+        if seasonal_factors is None:
+            seasonal_factors = self._calculate_seasonal_factors()
+            self.feature_cache.set(("seasonal_factors", None), seasonal_factors)
         
         return {
             "product_data": product_data,
@@ -164,6 +449,29 @@ class DynamicPricingEngine:
             "context": context
         }
 
+    async def _get_cached(self, kind: str, product_id: str, fetch) -> Any:
+        """Return a cached per-product input, fetching it on miss or expiry."""
+        return await self.feature_cache.get_or_fetch(
+            (kind, product_id), lambda: fetch(product_id)
+        )
+
+    def on_inventory_change(self, product_id: str):
+        """Invalidate cached inputs and table prices after an inventory event."""
+        self._invalidate_product_features(product_id)
+        self.price_table.evict(product_id)
+
+    def on_price_change(self, product_id: str):
+        """Invalidate cached inputs and table prices after a price change."""
+        self._invalidate_product_features(product_id)
+        self.price_table.evict(product_id)
+        # The base price lives in the compiled constraints; reload them
+        # without dropping other products' table prices
+        self._pricing_rules_stale = True
+
+    def _invalidate_product_features(self, product_id: str):
+        for kind in ("sales_data", "market_data"):
+            self.feature_cache.invalidate((kind, product_id))
+
     async def _predict_demand(self, features: Dict) -> float:
         """Predict demand using deep learning model."""
         # Prepare features
@@ -173,7 +481,9 @@ class DynamicPricingEngine:
         X_scaled = self.scaler.transform(X)
         
         # Get prediction
-        prediction = self.demand_model.predict(X_scaled)
+        prediction = await self._run_inference(
+            self.demand_fn, self.demand_batcher, X_scaled
+        )
         
         return float(prediction[0][0])
 
@@ -183,10 +493,47 @@ class DynamicPricingEngine:
         X = self._prepare_features_for_elasticity(features)
         
         # Get prediction
-        elasticity = self.elasticity_model.predict(X)
+        elasticity = self._predict_elasticity(X)
         
         return float(elasticity[0])
 
+    def _predict_elasticity(self, X: np.ndarray) -> np.ndarray:
+        """Predict elasticity with the exported flat-array tree ensemble."""
+        if self.elasticity_fn is None:
+            self.refresh_elasticity_evaluator()
+        return self.elasticity_fn.predict(np.atleast_2d(X))
+
+    def refresh_elasticity_evaluator(self):
+        """Re-export the elasticity model; call after it is (re)fitted."""
+        self.elasticity_fn = FlatTreeEnsemble.from_sklearn(self.elasticity_model)
+
+    def update_models(
+        self,
+        demand_model: Optional[tf.keras.Model] = None,
+        elasticity_model: Optional[GradientBoostingRegressor] = None,
+        actor: Optional[tf.keras.Model] = None
+    ):
+        """Swap in retrained or reloaded models and re-export their weights.
+        
+        Models that are passed replace the current ones; the rest are assumed
+        to have been trained in place. Either way the compiled forward passes
+        are re-exported, the tree evaluator is rebuilt on its next use and
+        prices precomputed by the old models are dropped.
+        """
+        if demand_model is not None:
+            self.demand_model = demand_model
+            self.demand_fn.model = demand_model
+        if elasticity_model is not None:
+            self.elasticity_model = elasticity_model
+        if actor is not None:
+            self.price_optimizer["actor"] = actor
+            self.actor_fn.model = actor
+        
+        self.demand_fn.refresh()
+        self.actor_fn.refresh()
+        self.elasticity_fn = None
+        self.price_table.clear()
+
     async def _optimize_price(
         self,
         features: Dict,
@@ -204,7 +551,9 @@ class DynamicPricingEngine:
         )
         
         # Get action from actor network
-        action = self.price_optimizer["actor"].predict(state)
+        action = await self._run_inference(
+            self.actor_fn, self.actor_batcher, state
+        )
         
         # Convert action to price
         base_price = features["product_data"]["base_price"]
@@ -222,47 +571,156 @@ class DynamicPricingEngine:
         context: Optional[Dict]
     ) -> Dict:
         """Apply business rules and constraints to optimal price."""
-        # Get pricing rules
-        rules = await self.db.get_pricing_rules(product_id)
-        
-        # Get product constraints
-        constraints = await self.db.get_product_constraints(product_id)
-        
-        # Apply minimum margin
-        min_price = constraints["cost"] * (1 + constraints["min_margin"])
-        optimal_price = max(optimal_price, min_price)
-        
-        # Apply maximum discount
-        max_discount = constraints["max_discount"]
-        original_price = constraints["original_price"]
-        min_allowed_price = original_price * (1 - max_discount)
-        optimal_price = max(optimal_price, min_allowed_price)
+        final_prices = await self._apply_pricing_rules_batch(
+            [product_id],
+            np.array([optimal_price]),
+            user_id,
+            context
+        )
+        return final_prices[product_id]
+
+    async def _apply_pricing_rules_batch(
+        self,
+        product_ids: List[str],
+        optimal_prices: np.ndarray,
+        user_id: Optional[str],
+        context: Optional[Dict]
+    ) -> Dict[str, Dict]:
+        """Apply business rules and constraints to a batch of prices."""
+        # Apply rule bounds, minimum margin and maximum discount as array clamps
+        rules = await self._get_compiled_rules(product_ids)
+        result = rules.apply(product_ids, optimal_prices, context)
+        prices = result["price"]
+        original_prices = result["original_price"]
+        reasons = result["reason"]
         
         # Apply user-specific rules
         if user_id:
             user_rules = await self.db.get_user_pricing_rules(user_id)
-            optimal_price = self._apply_user_rules(optimal_price, user_rules)
-        
-        # Calculate final price and metadata
-        final_price = {
-            "price": round(optimal_price, 2),
-            "original_price": original_price,
-            "discount_percentage": round(
-                (original_price - optimal_price) / original_price * 100,
-                1
-            ),
-            "valid_until": datetime.now() + timedelta(
-                hours=self.config["price_validity_hours"]
-            ),
-            "reason": self._get_pricing_reason(
-                optimal_price,
-                original_price,
-                constraints,
-                context
-            )
+            prices = np.array([
+                self._apply_user_rules(price, user_rules) for price in prices
+            ])
+            reasons = rules.reasons(prices < original_prices, context)
+        
+        discount_percentage = np.round(
+            (original_prices - prices) / original_prices * 100, 1
+        )
+        valid_until = datetime.now() + timedelta(
+            hours=self.config["price_validity_hours"]
+        )
+        
+        return {
+            product_id: {
+                "price": round(float(prices[i]), 2),
+                "original_price": float(original_prices[i]),
+                "discount_percentage": float(discount_percentage[i]),
+                "valid_until": valid_until,
+                "reason": str(reasons[i])
+            }
+            for i, product_id in enumerate(product_ids)
+        }
+
+    async def _get_compiled_rules(self, product_ids: List[str]) -> CompiledPricingRules:
+        """Return compiled pricing rules covering ``product_ids`` where they exist."""
+        if self._pricing_rules_expired():
+            # Lazily created so the lock binds to the running loop
+            if self._pricing_rules_lock is None:
+                self._pricing_rules_lock = asyncio.Lock()
+            # Concurrent requests share one reload instead of each starting one
+            async with self._pricing_rules_lock:
+                if self._pricing_rules_expired():
+                    await self.refresh_pricing_rules()
+        
+        # Products added since the last full load are fetched individually
+        missing = self.pricing_rules.missing(product_ids)
+        if missing:
+            await self._load_missing_rules(missing)
+        return self.pricing_rules
+
+    def _pricing_rules_expired(self) -> bool:
+        rules = self.pricing_rules
+        return (
+            rules is None
+            or self._pricing_rules_stale
+            or (datetime.now() - rules.loaded_at).total_seconds()
+            > self.config.get("pricing_rules_ttl_seconds", 300)
+        )
+
+    async def refresh_pricing_rules(self):
+        """Load all pricing rules and product constraints into arrays."""
+        # Cleared before loading so a change during the load is not lost
+        self._pricing_rules_stale = False
+        constraints, rules = await asyncio.gather(
+            self.db.get_all_product_constraints(),
+            self.db.get_all_pricing_rules()
+        )
+        self.pricing_rules = CompiledPricingRules.from_records(constraints, rules)
+
+    async def _load_missing_rules(self, product_ids: List[str]):
+        """Fetch constraints and rules for products absent from the compiled arrays."""
+        # Cached per product so unknown ids are not re-fetched on every request
+        constraints, rules = await asyncio.gather(
+            asyncio.gather(*(
+                self._get_cached(
+                    "product_constraints", product_id, self.db.get_product_constraints
+                )
+                for product_id in product_ids
+            )),
+            asyncio.gather(*(
+                self._get_cached("pricing_rules", product_id, self.db.get_pricing_rules)
+                for product_id in product_ids
+            ))
+        )
+        found = {
+            product_id: record
+            for product_id, record in zip(product_ids, constraints)
+            if record is not None
         }
+        if found:
+            # Extended after the awaits so concurrent loads cannot drop rows
+            self.pricing_rules = self.pricing_rules.extend(
+                found, dict(zip(product_ids, rules))
+            )
+
+    def on_pricing_rules_change(self):
+        """Mark compiled pricing rules for reload and drop prices built from them."""
+        self._pricing_rules_stale = True
+        self.price_table.clear()
+
+    async def _log_pricing_decisions(
+        self,
+        product_ids: List[str],
+        final_prices: Dict[str, Dict],
+        features: List[Dict],
+        start_time: datetime
+    ):
+        """Log a batch of pricing decisions with one bulk insert."""
+        duration = (datetime.now() - start_time).total_seconds()
+        timestamp = datetime.now().isoformat()
+        
+        rows = [
+            {
+                "product_id": product_id,
+                "timestamp": timestamp,
+                "final_price": final_prices[product_id]["price"],
+                "original_price": final_prices[product_id]["original_price"],
+                "discount_percentage": final_prices[product_id]["discount_percentage"],
+                "processing_time": duration / len(product_ids),
+                "features": product_features
+            }
+            for product_id, product_features in zip(product_ids, features)
+        ]
+        
+        # Queue for the background BigQuery writer
+        for row in rows:
+            await self.decision_sink.put(row)
         
-        return final_price
+        # Log metrics
+        await self.monitoring.log_metrics({
+            "bulk_pricing_latency": duration,
+            "bulk_pricing_count": len(product_ids),
+            "timestamp": timestamp
+        })
 
     async def _log_pricing_decision(
         self,
@@ -285,19 +743,9 @@ class DynamicPricingEngine:
             "features": features
         }
         
-        # Log to BigQuery
-        table_id = f"{self.config['project_id']}.pricing_decisions"
-        errors = self.bq_client.insert_rows_json(table_id, [log_data])
-        
-        if errors:
-            await self.monitoring.log_error(
-                Exception(f"Failed to log pricing decision: {errors}"),
-                {
-                    "service": "dynamic_pricing",
-                    "operation": "log_pricing_decision",
-                    "product_id": product_id
-                }
-            )
+        # Queue for the background BigQuery writer; serialisation and the
+        # insert happen off the event loop
+        await self.decision_sink.put(log_data)
         
         # Log metrics
         await self.monitoring.log_metrics({
@@ -307,25 +755,8 @@ class DynamicPricingEngine:
             "timestamp": datetime.now().isoformat()
         })
 
-    def _get_pricing_reason(
-        self,
-        optimal_price: float,
-        original_price: float,
-        constraints: Dict,
-        context: Optional[Dict]
-    ) -> str:
-        """Get human-readable reason for pricing decision."""
-        if optimal_price < original_price:
-            if context and context.get("high_inventory", False):
-                return "High inventory levels"
-            elif context and context.get("competitive_pressure", False):
-                return "Competitive pricing"
-            else:
-                return "Demand optimization"
-        else:
-            if context and context.get("low_inventory", False):
-                return "Low inventory levels"
-            elif context and context.get("high_demand", False):
-                return "High demand"
-            else:
-                return "Market conditions"
+    async def close(self):
+        """Drain background work before shutdown."""
+        await self.decision_sink.close()
+        await self.demand_batcher.close()
+        await self.actor_batcher.close()
@@ -0,0 +1,168 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import hashlib
+import json
+import os
+import numpy as np
+
+class ProductEmbeddingStore:
+    """On-disk product embedding matrix keyed by product id and content hash.
+
+    Embeddings live in a memory-mapped ``embeddings.npy`` (float16 by default)
+    and are L2-normalised on write unless ``normalize`` is off, so a request
+    only needs a row gather and a matrix product. ``keys.json`` maps each
+    product id to its row and the hash of the content the row was computed
+    from; rows whose hash no longer matches are reported by ``stale`` and
+    recomputed offline.
+    """
+
+    EMBEDDINGS_FILE = "embeddings.npy"
+    KEYS_FILE = "keys.json"
+
+    def __init__(
+        self,
+        path: str,
+        dim: int,
+        dtype: str = "float16",
+        version: Optional[str] = None,
+        normalize: bool = True,
+        initial_capacity: int = 1024
+    ):
+        self.path = path
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.version = version
+        self.normalize = normalize
+        self._rows: Dict[str, int] = {}
+        self._hashes: Dict[str, str] = {}
+
+        os.makedirs(path, exist_ok=True)
+        embeddings_path = os.path.join(path, self.EMBEDDINGS_FILE)
+        keys_path = os.path.join(path, self.KEYS_FILE)
+
+        keys = None
+        if os.path.exists(embeddings_path) and os.path.exists(keys_path):
+            with open(keys_path) as f:
+                keys = json.load(f)
+
+        # A version change (e.g. new encoder) invalidates every row
+        if keys and keys.get("version") == version and keys["dim"] == dim:
+            self._rows = {pid: row for pid, (row, _) in keys["rows"].items()}
+            self._hashes = {pid: h for pid, (_, h) in keys["rows"].items()}
+            self._embeddings = np.load(embeddings_path, mmap_mode="r+")
+        else:
+            self._embeddings = np.lib.format.open_memmap(
+                embeddings_path,
+                mode="w+",
+                dtype=self.dtype,
+                shape=(initial_capacity, dim)
+            )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self._rows
+
+    @staticmethod
+    def content_hash(content: Union[str, bytes]) -> str:
+        """Hash the content an embedding is computed from."""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return hashlib.sha1(content).hexdigest()
+
+    def stale(self, content_hashes: Dict[str, str]) -> List[str]:
+        """Return product ids that are missing or whose content changed."""
+        return [
+            product_id
+            for product_id, content_hash in content_hashes.items()
+            if self._hashes.get(product_id) != content_hash
+        ]
+
+    def upsert(
+        self,
+        product_ids: Sequence[str],
+        content_hashes: Sequence[str],
+        vectors: np.ndarray
+    ):
+        """Write embeddings for the given products, reusing existing rows."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.normalize:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.maximum(norms, 1e-12)
+
+        rows = np.empty(len(product_ids), dtype=np.int64)
+        next_row = len(self._rows)
+        for i, product_id in enumerate(product_ids):
+            if product_id not in self._rows:
+                self._rows[product_id] = next_row
+                next_row += 1
+            rows[i] = self._rows[product_id]
+            self._hashes[product_id] = content_hashes[i]
+
+        self._ensure_capacity(next_row)
+        self._embeddings[rows] = vectors.astype(self.dtype)
+
+    def gather(self, product_ids: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return float32 embeddings and a found-mask for ``product_ids``.
+
+        Products without an embedding get a zero vector.
+        """
+        rows = np.fromiter(
+            (self._rows.get(product_id, -1) for product_id in product_ids),
+            dtype=np.int64
+        )
+        found = rows >= 0
+
+        embeddings = np.zeros((len(rows), self.dim), dtype=np.float32)
+        embeddings[found] = self._embeddings[rows[found]]
+
+        return embeddings, found
+
+    def items(self) -> Tuple[List[str], np.ndarray]:
+        """Return all stored product ids and a view of their embeddings."""
+        product_ids = sorted(self._rows, key=self._rows.get)
+        return product_ids, self._embeddings[:len(product_ids)]
+
+    def flush(self):
+        """Flush embeddings to disk and persist the key map atomically."""
+        self._embeddings.flush()
+
+        keys_path = os.path.join(self.path, self.KEYS_FILE)
+        tmp_path = f"{keys_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "version": self.version,
+                "dim": self.dim,
+                "rows": {
+                    pid: [row, self._hashes[pid]]
+                    for pid, row in self._rows.items()
+                }
+            }, f)
+        os.replace(tmp_path, keys_path)
+
+    def _ensure_capacity(self, n_rows: int):
+        """Grow the memory-mapped file by doubling when it is too small."""
+        capacity = len(self._embeddings)
+        if n_rows <= capacity:
+            return
+        capacity = max(capacity, 1)
+
+        while capacity < n_rows:
+            capacity *= 2
+
+        embeddings_path = os.path.join(self.path, self.EMBEDDINGS_FILE)
+        tmp_path = f"{embeddings_path}.tmp"
+        grown = np.lib.format.open_memmap(
+            tmp_path,
+            mode="w+",
+            dtype=self.dtype,
+            shape=(capacity, self.dim)
+        )
+        grown[:len(self._embeddings)] = self._embeddings
+        grown.flush()
+        del grown
+
+        self._embeddings.flush()
+        del self._embeddings
+        os.replace(tmp_path, embeddings_path)
+        self._embeddings = np.load(embeddings_path, mmap_mode="r+")
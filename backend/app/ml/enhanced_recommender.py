@@ -10,8 +10,14 @@ import pandas as pd
 from google.cloud import aiplatform
 from datetime import datetime
 import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from ..monitoring import MonitoringService
 from ..database import AsyncDatabase
+from .ann_index import IVFIndex
+from .embedding_store import ProductEmbeddingStore
+from .topk import top_k
+from .batching import MicroBatcher
 
 class HybridRecommender:
     def __init__(self, config: Dict):
@@ -22,13 +28,42 @@ class HybridRecommender:
         self.text_encoder = AutoModel.from_pretrained('bert-base-uncased')
         self.scaler = StandardScaler()
         
+        # Fallback text encodes run on their own small pool; the semaphore
+        # keeps at most one encode per worker in flight so none queue up.
+        # It is created on first use so it binds to the serving loop.
+        self._encoder_workers = config.get("text_encoder_workers", 2)
+        self._encoder_executor = ThreadPoolExecutor(
+            max_workers=self._encoder_workers,
+            thread_name_prefix="text-encoder"
+        )
+        self._encoder_slots: Optional[asyncio.Semaphore] = None
+        
         # Initialize neural collaborative filtering model
         self.ncf_model = self._build_ncf_model()
+        self.ncf_batcher = MicroBatcher(
+            lambda inputs: self.ncf_model.predict(inputs, verbose=0),
+            name="ncf",
+            max_batch_size=config.get("inference_batch_size", 4096),
+            max_wait_ms=config.get("inference_max_wait_ms", 2.0),
+            monitoring=self.monitoring
+        )
         
         # Initialize vertex AI client
         self.vertex_ai = aiplatform.gapic.PredictionServiceClient(
             client_options={"api_endpoint": config["vertex_ai_endpoint"]}
         )
+        
+        # Precomputed product text embeddings, filled offline
+        self.embedding_store = None
+        if config.get("embedding_store_path"):
+            self.embedding_store = ProductEmbeddingStore(
+                config["embedding_store_path"],
+                dim=self.text_encoder.config.hidden_size,
+                version=config.get("embedding_store_version", "bert-base-uncased")
+            )
+        
+        # Load ANN index used for candidate generation, if one was built
+        self.candidate_index = self._load_candidate_index()
 
     def _build_ncf_model(self) -> tf.keras.Model:
         """Build Neural Collaborative Filtering model."""
@@ -76,32 +111,34 @@ class HybridRecommender:
             start_time = datetime.now()
             
             # Get user features and history
-            user_features = await self._get_user_features(user_id)
-            user_history = await self._get_user_history(user_id)
+            user_features, user_history = await asyncio.gather(
+                self._get_user_features(user_id),
+                self._get_user_history(user_id)
+            )
             
             # Get candidate items
-            candidates = await self._get_candidate_items(user_id, context)
-            
-            # Get different types of recommendations
-            collaborative_scores = await self._get_collaborative_scores(
-                user_features, candidates
-            )
-            content_scores = await self._get_content_based_scores(
-                user_history, candidates
-            )
-            context_scores = await self._get_contextual_scores(
-                user_id, candidates, context
+            candidates = await self._get_candidate_items(
+                user_id, user_history, context
             )
             
+            # Get different types of recommendations concurrently
+            scores = await self._run_scorers({
+                "collaborative": self._get_collaborative_scores(
+                    user_features, candidates
+                ),
+                "content": self._get_content_based_scores(
+                    user_history, candidates
+                ),
+                "context": self._get_contextual_scores(
+                    user_id, candidates, context
+                )
+            })
+            
             # Combine scores using weighted average
-            final_scores = (
-                self.config["collaborative_weight"] * collaborative_scores +
-                self.config["content_weight"] * content_scores +
-                self.config["context_weight"] * context_scores
-            )
+            final_scores = self._blend_scores(scores, len(candidates))
             
             # Get top N recommendations
-            top_indices = np.argsort(final_scores)[-n_recommendations:][::-1]
+            top_indices = top_k(final_scores, n_recommendations)
             recommendations = [candidates[i] for i in top_indices]
             
             # Enrich recommendations with additional data
@@ -123,6 +160,152 @@ class HybridRecommender:
             })
             raise
 
+    async def _run_scorers(self, scorers: Dict) -> Dict[str, np.ndarray]:
+        """Run scorers concurrently, dropping any that miss a configured deadline."""
+        async def run(name: str, scorer) -> Optional[np.ndarray]:
+            # No deadline unless one is configured for this scorer or globally
+            timeout = self.config.get("scorer_timeouts", {}).get(
+                name, self.config.get("scorer_timeout")
+            )
+            try:
+                return await asyncio.wait_for(scorer, timeout=timeout)
+            except Exception as e:
+                await self.monitoring.log_error(e, {
+                    "service": "recommender",
+                    "operation": "run_scorers",
+                    "scorer": name,
+                    "timed_out": isinstance(e, asyncio.TimeoutError)
+                })
+                return None
+        
+        results = await asyncio.gather(
+            *(run(name, scorer) for name, scorer in scorers.items())
+        )
+        
+        return {
+            name: result
+            for name, result in zip(scorers, results)
+            if result is not None
+        }
+
+    def _blend_scores(
+        self,
+        scores: Dict[str, np.ndarray],
+        n_candidates: int
+    ) -> np.ndarray:
+        """Weighted average of scores, renormalised over scorers that returned."""
+        weights = {
+            "collaborative": self.config["collaborative_weight"],
+            "content": self.config["content_weight"],
+            "context": self.config["context_weight"]
+        }
+        
+        total_weight = sum(weights[name] for name in scores)
+        if not scores or total_weight <= 0:
+            return np.zeros(n_candidates)
+        
+        return sum(
+            weights[name] / total_weight * np.asarray(score)
+            for name, score in scores.items()
+        )
+
+    def _load_candidate_index(self) -> Optional[IVFIndex]:
+        """Load the persisted ANN candidate index if one is configured."""
+        index_path = self.config.get("ann_index_path")
+        if index_path and os.path.exists(index_path):
+            return IVFIndex.load(index_path)
+        return None
+
+    async def refresh_embedding_store(self, products: List[Dict]) -> int:
+        """Encode new or changed product descriptions into the embedding store."""
+        content_hashes = {
+            p["id"]: ProductEmbeddingStore.content_hash(p["description"])
+            for p in products
+        }
+        stale_ids = set(self.embedding_store.stale(content_hashes))
+        stale_products = [p for p in products if p["id"] in stale_ids]
+        
+        # Encode in batches to bound tokenizer and model memory
+        batch_size = self.config.get("embedding_batch_size", 256)
+        for i in range(0, len(stale_products), batch_size):
+            batch = stale_products[i:i + batch_size]
+            self.embedding_store.upsert(
+                [p["id"] for p in batch],
+                [content_hashes[p["id"]] for p in batch],
+                self._get_text_embeddings([p["description"] for p in batch])
+            )
+        
+        self.embedding_store.flush()
+        
+        await self.monitoring.log_metrics({
+            "embedding_store_updated": len(stale_products),
+            "embedding_store_size": len(self.embedding_store),
+            "timestamp": datetime.now().isoformat()
+        })
+        
+        return len(stale_products)
+
+    async def build_candidate_index(self, products: List[Dict]) -> IVFIndex:
+        """Encode the catalog offline and persist an ANN index over it."""
+        if self.embedding_store is not None:
+            await self.refresh_embedding_store(products)
+            
+            # Index only the live catalog, not rows left by deleted products
+            embeddings, found = self.embedding_store.gather(p["id"] for p in products)
+            product_ids = [p["id"] for p, ok in zip(products, found) if ok]
+            embeddings = embeddings[found]
+        else:
+            batch_size = self.config.get("embedding_batch_size", 256)
+            product_ids = [p["id"] for p in products]
+            embeddings = np.concatenate([
+                self._get_text_embeddings(
+                    [p["description"] for p in products[i:i + batch_size]]
+                )
+                for i in range(0, len(products), batch_size)
+            ])
+        
+        index = IVFIndex.build(
+            product_ids,
+            embeddings,
+            n_lists=self.config.get("ann_n_lists"),
+            n_probe=self.config.get("ann_n_probe", 16)
+        )
+        index.save(self.config["ann_index_path"])
+        self.candidate_index = index
+        
+        return index
+
+    async def _get_candidate_items(
+        self,
+        user_id: str,
+        user_history: List[Dict],
+        context: Optional[Dict]
+    ) -> List[Dict]:
+        """Get candidate items via ANN lookup, falling back to a full scan."""
+        if self.candidate_index is None or not user_history:
+            return await self.db.get_candidate_items(user_id, context)
+        
+        # Query the index with the centroid of the user's history
+        if self.embedding_store is not None:
+            history_embeddings, found = self.embedding_store.gather(
+                item["id"] for item in user_history
+            )
+            # Items without a stored embedding would pull the centroid to zero
+            history_embeddings = history_embeddings[found]
+            if not len(history_embeddings):
+                return await self.db.get_candidate_items(user_id, context)
+        else:
+            history_embeddings = self._get_text_embeddings(
+                [item["description"] for item in user_history]
+            )
+        query = history_embeddings.mean(axis=0)
+        
+        candidate_ids, _ = self.candidate_index.search(
+            query, self.config.get("ann_candidates", 500)
+        )
+        
+        return await self.db.get_products_by_ids(candidate_ids.tolist())
+
     async def _get_user_features(self, user_id: str) -> np.ndarray:
         """Get user features from database and process them."""
         user_data = await self.db.get_user_features(user_id)
@@ -139,19 +322,54 @@ class HybridRecommender:
         
         return np.concatenate([categorical_features, numerical_features], axis=1)
 
+    async def _get_collaborative_scores(
+        self,
+        user_features: np.ndarray,
+        candidates: List[Dict]
+    ) -> np.ndarray:
+        """Score candidates with the NCF model through the shared batcher."""
+        item_features = np.asarray(
+            [item["item_features"] for item in candidates],
+            dtype=np.float32
+        )
+        user_rows = np.repeat(
+            np.atleast_2d(user_features).astype(np.float32),
+            len(candidates),
+            axis=0
+        )
+        
+        scores = await self.ncf_batcher.predict(user_rows, item_features)
+        return scores.ravel()
+
     async def _get_content_based_scores(
         self, 
         user_history: List[Dict],
         candidates: List[Dict]
     ) -> np.ndarray:
         """Calculate content-based similarity scores."""
-        # Encode user history items
-        history_embeddings = self._get_text_embeddings(
+        if self.embedding_store is not None:
+            # Stored embeddings are normalised, so cosine is a matrix product
+            history_embeddings, found = self.embedding_store.gather(
+                item["id"] for item in user_history
+            )
+            history_embeddings = history_embeddings[found]
+            if not len(history_embeddings):
+                return np.zeros(len(candidates))
+            
+            # Candidates without an embedding keep a zero row and score 0
+            candidate_embeddings, _ = self.embedding_store.gather(
+                item["id"] for item in candidates
+            )
+            return (candidate_embeddings @ history_embeddings.T).max(axis=1)
+        
+        # Encode user history items off the event loop so the scorer
+        # deadline can still fire while the encoder runs
+        history_embeddings = await self._encode_texts(
             [item["description"] for item in user_history]
         )
         
         # Encode candidate items
-        candidate_embeddings = self._get_text_embeddings(
+        candidate_embeddings = await self._encode_texts(
             [item["description"] for item in candidates]
         )
         
@@ -164,6 +382,26 @@ class HybridRecommender:
         # Take maximum similarity for each candidate
         return similarity_scores.max(axis=1)
 
+    async def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Encode texts on the bounded encoder pool.
+        
+        A slot is held until the encode thread actually finishes, even if the
+        caller times out, so abandoned encodes cannot pile up under load.
+        """
+        if self._encoder_slots is None:
+            self._encoder_slots = asyncio.Semaphore(self._encoder_workers)
+        await self._encoder_slots.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._encoder_executor.submit(self._get_text_embeddings, texts)
+        except BaseException:
+            self._encoder_slots.release()
+            raise
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(self._encoder_slots.release)
+        )
+        return await asyncio.wrap_future(future)
+
     def _get_text_embeddings(self, texts: List[str]) -> np.ndarray:
         """Get BERT embeddings for text data."""
         # Tokenize texts
@@ -217,29 +455,57 @@ class HybridRecommender:
         context: Optional[Dict]
     ) -> List[Dict]:
         """Enrich recommendations with additional data."""
+        product_ids = [rec["id"] for rec in recommendations]
+        
+        # Fetch all three sources concurrently in bulk
+        prices, inventory, social_proof = await asyncio.gather(
+            self._fetch_enrichment(
+                "price", self.db.get_dynamic_prices_many(product_ids, user_id, context)
+            ),
+            self._fetch_enrichment(
+                "inventory", self.db.get_inventory_status_many(product_ids)
+            ),
+            self._fetch_enrichment(
+                "social_proof", self.db.get_social_proof_many(product_ids)
+            )
+        )
+        
         enriched = []
         for rec in recommendations:
-            # Get real-time price and inventory
-            price_info = await self._get_dynamic_price(rec["id"], user_id, context)
-            inventory = await self._get_inventory_status(rec["id"])
-            
-            # Get social proof
-            social_proof = await self._get_social_proof(rec["id"])
+            # Missing entries mean the source failed or timed out
+            price_info = prices.get(rec["id"], {})
+            inventory_info = inventory.get(rec["id"], {})
+            social_info = social_proof.get(rec["id"], {})
             
             enriched.append({
                 **rec,
-                "price": price_info["price"],
-                "original_price": price_info["original_price"],
-                "discount_percentage": price_info["discount_percentage"],
-                "inventory_status": inventory["status"],
-                "inventory_count": inventory["count"],
-                "ratings_count": social_proof["ratings_count"],
-                "average_rating": social_proof["average_rating"],
-                "recent_purchases": social_proof["recent_purchases"]
+                "price": price_info.get("price", rec.get("price")),
+                "original_price": price_info.get("original_price", rec.get("price")),
+                "discount_percentage": price_info.get("discount_percentage", 0.0),
+                "inventory_status": inventory_info.get("status"),
+                "inventory_count": inventory_info.get("count"),
+                "ratings_count": social_info.get("ratings_count"),
+                "average_rating": social_info.get("average_rating"),
+                "recent_purchases": social_info.get("recent_purchases")
             })
         
         return enriched
 
+    async def _fetch_enrichment(self, source: str, lookup) -> Dict[str, Dict]:
+        """Await a bulk enrichment lookup, degrading to no data on failure."""
+        try:
+            return await asyncio.wait_for(
+                lookup,
+                timeout=self.config.get("enrichment_timeout", 0.25)
+            )
+        except Exception as e:
+            await self.monitoring.log_error(e, {
+                "service": "recommender",
+                "operation": "enrich_recommendations",
+                "source": source
+            })
+            return {}
+
     async def _log_recommendation_metrics(
         self,
         user_id: str,
@@ -1,6 +1,8 @@
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+from scipy import sparse
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.feature_extraction.text import TfidfVectorizer
 from datetime import datetime, timedelta
@@ -8,6 +10,14 @@ import asyncio
 from google.cloud import bigquery
 from ..monitoring import MonitoringService
 from .model_registry import ModelRegistry
+from .feature_writer import FeatureSetWriter
+from .feature_store import EVENT_TIMESTAMP, LocalFeatureStore, to_utc
+from .aggregate_state import DailyAggregateState, to_naive_utc
+
+# Row of each product in FeatureEngineeringPipeline.text_features
+TEXT_ROW = "text_feature_row"
+# Join keys, kept in feature sets but never used as model inputs
+ID_COLUMNS = ("user_id", "product_id")
 
 class FeatureEngineeringPipeline:
     def __init__(self, config: Dict):
@@ -15,20 +25,55 @@ class FeatureEngineeringPipeline:
         self.monitoring = MonitoringService()
         self.model_registry = ModelRegistry(config)
         self.bq_client = bigquery.Client()
+        self.feature_writer = FeatureSetWriter(
+            self.bq_client,
+            chunk_rows=config.get("feature_write_chunk_rows", 100000),
+            local_path=config.get("feature_output_path")
+        )
+        self.feature_store = (
+            LocalFeatureStore(config["feature_store_path"])
+            if config.get("feature_store_path") else None
+        )
+        # Used by streaming extraction only; in memory the counts come from
+        # the interactions that are loaded anyway
+        self.aggregate_state = (
+            DailyAggregateState(
+                config["aggregate_state_path"],
+                "interaction_counts",
+                lag=timedelta(hours=config.get("aggregate_state_lag_hours", 6))
+            )
+            if config.get("aggregate_state_path") else None
+        )
         
         # Initialize encoders
         self.label_encoders = {}
-        self.tfidf = TfidfVectorizer(max_features=100)
+        self.tfidf = TfidfVectorizer(
+            max_features=config.get("max_text_features", 100),
+            dtype=np.float32
+        )
         self.scaler = StandardScaler()
+        # TF-IDF rows for the latest products, plus a trailing empty row
+        self.text_features: Optional[sparse.csr_matrix] = None
         
     async def create_feature_set(
         self,
         feature_set_name: str,
         start_date: datetime,
         end_date: datetime
-    ) -> pd.DataFrame:
-        """Create a feature set for model training."""
+    ) -> Optional[pd.DataFrame]:
+        """Create a feature set for model training.
+        
+        With ``streaming_extraction`` the feature set is written chunk by
+        chunk and never held in memory, so None is returned. Use
+        ``create_training_matrix`` to also get the model inputs.
+        """
         try:
+            if self.config.get("streaming_extraction", False):
+                await self._stream_feature_set(
+                    feature_set_name, start_date, end_date, collect=False
+                )
+                return None
+            
             # Extract raw data
             raw_data = await self._extract_raw_data(start_date, end_date)
             
@@ -48,12 +93,106 @@ class FeatureEngineeringPipeline:
             })
             raise
 
+    async def create_training_matrix(
+        self,
+        feature_set_name: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Tuple[sparse.csr_matrix, List[str]]:
+        """Create a feature set and return its scaled model inputs and column names.
+        
+        Works in both modes; with ``streaming_extraction`` the interactions
+        are still read only once.
+        """
+        if self.config.get("streaming_extraction", False):
+            try:
+                return await self._stream_feature_set(
+                    feature_set_name, start_date, end_date, collect=True
+                )
+            except Exception as e:
+                await self.monitoring.log_error(e, {
+                    "service": "feature_engineering",
+                    "operation": "create_training_matrix",
+                    "feature_set_name": feature_set_name
+                })
+                raise
+        
+        features = await self.create_feature_set(feature_set_name, start_date, end_date)
+        return self.feature_matrix(features), self.feature_names(features)
+
+    async def _stream_feature_set(
+        self,
+        feature_set_name: str,
+        start_date: datetime,
+        end_date: datetime,
+        collect: bool
+    ) -> Optional[Tuple[sparse.csr_matrix, List[str]]]:
+        """Write a feature set from a single pass over interaction pages.
+        
+        Scaling needs statistics over the whole window, so chunks are
+        written unscaled while the scaler is fitted; the fitted scaler
+        travels with the pipeline. With ``collect`` each chunk's model
+        inputs are also kept as float32 rows plus CSR text rows, and are
+        scaled once the pass is over.
+        """
+        inputs = await self._load_stream_inputs(start_date, end_date)
+        self.scaler = StandardScaler()
+        dense, text, columns = [], [], None
+        
+        async def chunks():
+            nonlocal columns
+            async for chunk in self._iter_features(inputs):
+                self.scaler.partial_fit(chunk[self._scaled_columns(chunk)])
+                if collect:
+                    columns = self._model_input_columns(chunk)
+                    dense.append(chunk[columns].to_numpy(dtype=np.float32))
+                    text.append(self._gather_text_features(chunk))
+                yield chunk
+        
+        await self._save_feature_chunks(feature_set_name, chunks())
+        if not collect:
+            return None
+        if not dense:
+            raise ValueError(f"Feature set {feature_set_name} has no rows")
+        
+        return sparse.hstack([
+            sparse.csr_matrix(self._scale_columns(np.vstack(dense), columns)),
+            sparse.vstack(text, format="csr")
+        ], format="csr"), list(columns) + self._text_feature_names()
+
+    def _scale_columns(self, values: np.ndarray, columns: pd.Index) -> np.ndarray:
+        """Apply the fitted scaler in place to the columns it was fitted on."""
+        stats = dict(zip(
+            self.scaler.feature_names_in_,
+            zip(self.scaler.mean_, self.scaler.scale_)
+        ))
+        for j, column in enumerate(columns):
+            if column in stats:
+                mean, scale = stats[column]
+                values[:, j] = (values[:, j] - mean) / scale
+        return values
+
     async def _extract_raw_data(
         self,
         start_date: datetime,
         end_date: datetime
     ) -> Dict[str, pd.DataFrame]:
         """Extract raw data from various sources."""
+        queries, query_params = self._raw_data_queries(start_date, end_date)
+        
+        # Execute queries concurrently
+        results = await asyncio.gather(*(
+            self._execute_query(query, query_params) for query in queries.values()
+        ))
+        
+        return dict(zip(queries, results))
+
+    def _raw_data_queries(
+        self,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Tuple[Dict[str, str], List[bigquery.ScalarQueryParameter]]:
+        """Build the raw data queries and their shared date parameters."""
         # User data
         user_query = f"""
         SELECT *
@@ -80,16 +219,11 @@ class FeatureEngineeringPipeline:
             bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date)
         ]
         
-        # Execute queries
-        user_data = await self._execute_query(user_query, query_params)
-        product_data = await self._execute_query(product_query, query_params)
-        interaction_data = await self._execute_query(interaction_query, query_params)
-        
         return {
-            "users": user_data,
-            "products": product_data,
-            "interactions": interaction_data
-        }
+            "users": user_query,
+            "products": product_query,
+            "interactions": interaction_query
+        }, query_params
 
     async def _transform_features(self, raw_data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
         """Transform raw data into features."""
@@ -104,7 +238,57 @@ class FeatureEngineeringPipeline:
             raw_data["interactions"]
         )
         
-        # Combine features
+        # Combine features, point-in-time correct when a feature store is set
+        event_times = None
+        if self.feature_store is not None:
+            await self._materialize_entity_features(
+                user_features,
+                product_features,
+                raw_data["users"],
+                raw_data["products"]
+            )
+            event_times = raw_data["interactions"]["timestamp"]
+        
+        features = self._combine_features(
+            interaction_features,
+            user_features,
+            product_features,
+            event_times
+        )
+        
+        # Scale numerical features
+        return self._scale_features(features, fit=True)
+
+    def _combine_features(
+        self,
+        interaction_features: pd.DataFrame,
+        user_features: pd.DataFrame,
+        product_features: pd.DataFrame,
+        event_times: Optional[pd.Series] = None
+    ) -> pd.DataFrame:
+        """Join user and product features onto interaction rows.
+        
+        With ``event_times`` user and product features are read from the
+        feature store for just these rows' ids, and each interaction sees
+        the snapshot in effect when it happened. Interactions older than an
+        entity's first snapshot get that snapshot unless
+        ``feature_store_backfill`` is off, in which case they get NaNs. Text
+        feature rows are not materialised and come from ``product_features``.
+        """
+        if event_times is not None:
+            backfill = self.config.get("feature_store_backfill", True)
+            features = self.feature_store.join(
+                interaction_features, "users", event_times, backfill
+            )
+            features = self.feature_store.join(
+                features, "products", event_times, backfill
+            )
+            return features.merge(
+                product_features[["product_id", TEXT_ROW]],
+                on="product_id",
+                how="left"
+            )
+        
         features = pd.merge(
             interaction_features,
             user_features,
@@ -112,19 +296,109 @@ class FeatureEngineeringPipeline:
             how="left"
         )
         
-        features = pd.merge(
+        return pd.merge(
             features,
             product_features,
             on="product_id",
             how="left"
         )
-        
-        # Scale numerical features
-        numerical_cols = features.select_dtypes(include=[np.number]).columns
-        features[numerical_cols] = self.scaler.fit_transform(features[numerical_cols])
+
+    def _scale_features(self, features: pd.DataFrame, fit: bool) -> pd.DataFrame:
+        """Standardise numerical columns, fitting the scaler first if requested."""
+        numerical_cols = self._scaled_columns(features)
+        if fit:
+            features[numerical_cols] = self.scaler.fit_transform(features[numerical_cols])
+        else:
+            features[numerical_cols] = self.scaler.transform(features[numerical_cols])
         
         return features
 
+    def _scaled_columns(self, features: pd.DataFrame) -> pd.Index:
+        """Numerical columns, leaving out the text feature row index."""
+        return features.select_dtypes(include=[np.number]).columns.drop(
+            TEXT_ROW, errors="ignore"
+        )
+
+    def _gather_text_features(self, features: pd.DataFrame) -> sparse.csr_matrix:
+        """TF-IDF rows for each feature row; rows with no product get an empty row."""
+        rows = features[TEXT_ROW].to_numpy(dtype=np.float64)
+        empty_row = self.text_features.shape[0] - 1
+        return self.text_features[np.where(np.isnan(rows), empty_row, rows).astype(np.int64)]
+
+    def _text_feature_names(self) -> List[str]:
+        return [f"text_feature_{i}" for i in range(self.text_features.shape[1])]
+
+    def feature_matrix(self, features: pd.DataFrame) -> sparse.csr_matrix:
+        """Numerical, flag and sparse text features as one CSR matrix for training."""
+        dense_cols = self._model_input_columns(features)
+        
+        return sparse.hstack([
+            sparse.csr_matrix(features[dense_cols].to_numpy(dtype=np.float32)),
+            self._gather_text_features(features)
+        ], format="csr")
+
+    def feature_names(self, features: pd.DataFrame) -> List[str]:
+        """Column names of ``feature_matrix(features)``, in order."""
+        return list(self._model_input_columns(features)) + self._text_feature_names()
+
+    def _model_input_columns(self, features: pd.DataFrame) -> pd.Index:
+        return features.select_dtypes(include=[np.number, "bool"]).columns.drop(
+            [TEXT_ROW, *ID_COLUMNS], errors="ignore"
+        )
+
+    async def _materialize_entity_features(
+        self,
+        user_features: pd.DataFrame,
+        product_features: pd.DataFrame,
+        user_data: pd.DataFrame,
+        product_data: pd.DataFrame
+    ):
+        """Write a snapshot of user and product features to the store.
+        
+        Values such as order totals reflect the source rows as they are
+        now, so each row is stamped with its source ``updated_at``, the time
+        those values took effect, or with the current time when the source
+        has none. Entities unchanged since their latest snapshot are
+        skipped, so repeated runs do not append identical rows.
+        """
+        snapshot_time = pd.Timestamp.now(tz="UTC")
+        # Text rows index this run's TF-IDF matrix, so they are never stored
+        product_features = product_features.drop(columns=[TEXT_ROW])
+        
+        def materialize():
+            for entity, features, source, entity_key in (
+                ("users", user_features, user_data, "user_id"),
+                ("products", product_features, product_data, "product_id")
+            ):
+                if "updated_at" in source:
+                    # An index assigns by position, whatever the frames' indexes
+                    stamps = pd.DatetimeIndex(
+                        to_utc(source["updated_at"]).fillna(snapshot_time)
+                    )
+                else:
+                    stamps = snapshot_time
+                features = features.assign(**{EVENT_TIMESTAMP: stamps})
+                self.feature_store.write(
+                    entity,
+                    self.feature_store.changed(entity, features, entity_key),
+                    entity_key
+                )
+        
+        await asyncio.to_thread(materialize)
+
+    async def get_online_features(
+        self,
+        entity: str,
+        entity_ids: List[str]
+    ) -> Dict[str, Dict]:
+        """Look up the latest materialised features for serving."""
+        if self.feature_store is None:
+            raise ValueError("feature_store_path is not configured")
+        
+        return await asyncio.to_thread(
+            self.feature_store.get_online_features, entity, entity_ids
+        )
+
     async def _create_user_features(self, user_data: pd.DataFrame) -> pd.DataFrame:
         """Create user-related features."""
         features = pd.DataFrame()
@@ -160,13 +434,14 @@ class FeatureEngineeringPipeline:
         # Basic product features
         features["product_id"] = product_data["product_id"]
         
-        # Text features
-        text_features = self.tfidf.fit_transform(
-            product_data["description"]
-        ).toarray()
-        
-        for i in range(text_features.shape[1]):
-            features[f"text_feature_{i}"] = text_features[:, i]
+        # Text features stay in a CSR matrix; the frame only keeps each
+        # product's row, which is gathered after the joins
+        text_features = self.tfidf.fit_transform(product_data["description"])
+        self.text_features = sparse.vstack([
+            text_features,
+            sparse.csr_matrix((1, text_features.shape[1]), dtype=text_features.dtype)
+        ], format="csr")
+        features[TEXT_ROW] = np.arange(len(features))
         
         # Categorical features
         categorical_cols = ["category", "brand", "supplier"]
@@ -191,9 +466,16 @@ class FeatureEngineeringPipeline:
 
     async def _create_interaction_features(
         self,
-        interaction_data: pd.DataFrame
+        interaction_data: pd.DataFrame,
+        interaction_types: Optional[List[str]] = None,
+        interaction_counts: Optional[pd.DataFrame] = None
     ) -> pd.DataFrame:
-        """Create interaction-related features."""
+        """Create interaction-related features.
+        
+        When the data is one chunk of a larger window, ``interaction_types``
+        fixes the one-hot columns and ``interaction_counts`` supplies
+        per-pair counts computed over the whole window.
+        """
         features = pd.DataFrame()
         
         # Basic interaction features
@@ -209,16 +491,27 @@ class FeatureEngineeringPipeline:
         ).dt.dayofweek
         
         # Interaction type features
-        interaction_types = pd.get_dummies(
-            interaction_data["interaction_type"],
-            prefix="interaction"
-        )
-        features = pd.concat([features, interaction_types], axis=1)
+        interaction_type = interaction_data["interaction_type"]
+        if interaction_types is not None:
+            interaction_type = interaction_type.astype(
+                pd.CategoricalDtype(interaction_types)
+            )
+        features = pd.concat([
+            features,
+            pd.get_dummies(interaction_type, prefix="interaction")
+        ], axis=1)
         
         # Aggregated features
-        features["interaction_count"] = interaction_data.groupby(
-            ["user_id", "product_id"]
-        )["interaction_type"].transform("count")
+        if interaction_counts is not None:
+            features = features.merge(
+                interaction_counts,
+                on=["user_id", "product_id"],
+                how="left"
+            )
+        else:
+            features["interaction_count"] = interaction_data.groupby(
+                ["user_id", "product_id"]
+            )["interaction_type"].transform("count")
         
         return features
 
@@ -227,23 +520,71 @@ class FeatureEngineeringPipeline:
         feature_set_name: str,
         features: pd.DataFrame
     ):
-        """Save feature set to BigQuery."""
+        """Save feature set to BigQuery, or to local files when offline."""
         table_id = f"{self.config['project_id']}.features.{feature_set_name}"
         
-        # Convert DataFrame to rows
-        rows_to_insert = features.to_dict("records")
+        # Write Parquet chunks and load them in a single job
+        stats = await asyncio.to_thread(
+            self.feature_writer.write,
+            table_id,
+            features.drop(columns=[TEXT_ROW]),
+            self._gather_text_features(features),
+            self._text_feature_names()
+        )
+        await self._log_feature_set_write(
+            feature_set_name,
+            stats,
+            list(features.columns.drop(TEXT_ROW)) + self._text_feature_names()
+        )
+
+    async def _save_feature_chunks(
+        self,
+        feature_set_name: str,
+        chunks: AsyncIterator[pd.DataFrame]
+    ):
+        """Save a feature set that arrives in chunks, appending each as it comes."""
+        table_id = f"{self.config['project_id']}.features.{feature_set_name}"
         
-        # Save to BigQuery
-        errors = self.bq_client.insert_rows_json(table_id, rows_to_insert)
-        if errors:
-            raise Exception(f"Failed to save feature set: {errors}")
+        # Text columns are declared up front so every chunk has the same layout
+        out = self.feature_writer.open(
+            table_id, sparse_columns=self._text_feature_names()
+        )
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(
+                    out.append,
+                    chunk.drop(columns=[TEXT_ROW]),
+                    self._gather_text_features(chunk),
+                    self._text_feature_names()
+                )
+        except BaseException:
+            out.abort()
+            raise
+        stats = await asyncio.to_thread(out.close)
+        await self._log_feature_set_write(feature_set_name, stats, out.columns)
+
+    async def _log_feature_set_write(
+        self,
+        feature_set_name: str,
+        stats: Dict[str, float],
+        columns: List[str]
+    ):
+        """Record write throughput and, when online, the feature set metadata."""
+        await self.monitoring.log_metrics({
+            "feature_set_write_rows": stats["rows"],
+            "feature_set_write_bytes": stats["bytes"],
+            "feature_set_write_time": stats["seconds"],
+            "feature_set_write_rows_per_sec": stats["rows_per_sec"],
+            "timestamp": datetime.now().isoformat()
+        })
         
         # Log feature set metadata
-        await self._log_feature_set_metadata(
-            feature_set_name,
-            features.shape,
-            list(features.columns)
-        )
+        if not self.feature_writer.offline:
+            await self._log_feature_set_metadata(
+                feature_set_name,
+                (stats["rows"], len(columns)),
+                columns
+            )
 
     async def _log_feature_set_metadata(
         self,
@@ -277,4 +618,204 @@ class FeatureEngineeringPipeline:
             job_config=bigquery.QueryJobConfig(query_parameters=query_params)
         )
         
-        return query_job.to_dataframe()
+        return await asyncio.to_thread(query_job.to_dataframe)
+
+    async def _load_stream_inputs(
+        self,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Dict[str, Any]:
+        """Run the queries and build everything chunks share except interactions."""
+        results = await self._run_raw_data_queries(start_date, end_date)
+        if self.aggregate_state is not None:
+            counts = self._get_interaction_counts(start_date, end_date)
+        else:
+            counts = asyncio.to_thread(results["interaction_counts"].to_dataframe)
+        users, products, types, counts = await asyncio.gather(*(
+            asyncio.to_thread(results[name].to_dataframe)
+            for name in ("users", "products", "interaction_types")
+        ), counts)
+        
+        user_features = await self._create_user_features(users)
+        product_features = await self._create_product_features(products)
+        interaction_types = sorted(types["interaction_type"])
+        
+        if self.feature_store is not None:
+            await self._materialize_entity_features(
+                user_features, product_features, users, products
+            )
+        
+        return {
+            "interactions": results["interactions"],
+            "user_features": user_features,
+            "product_features": product_features,
+            "interaction_types": interaction_types,
+            "interaction_counts": counts
+        }
+
+    async def _iter_features(self, inputs: Dict[str, Any]) -> AsyncIterator[pd.DataFrame]:
+        """Yield unscaled features for each page of interactions.
+        
+        Users, products and window-wide interaction aggregates come from
+        ``inputs``; interactions are never materialised in full.
+        """
+        async for batch in self._iter_record_batches(inputs["interactions"]):
+            interactions = batch.to_pandas()
+            interaction_features = await self._create_interaction_features(
+                interactions,
+                interaction_types=inputs["interaction_types"],
+                interaction_counts=inputs["interaction_counts"]
+            )
+            yield self._combine_features(
+                interaction_features,
+                inputs["user_features"],
+                inputs["product_features"],
+                interactions["timestamp"] if self.feature_store is not None else None
+            )
+
+    async def _run_raw_data_queries(
+        self,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Dict[str, bigquery.QueryJob]:
+        """Run the raw data and aggregate queries concurrently."""
+        queries, query_params = self._raw_data_queries(start_date, end_date)
+        table = f"`{self.config['project_id']}.interactions.interaction_data`"
+        
+        # Window-wide aggregates that single chunks cannot compute themselves
+        if self.aggregate_state is None:
+            queries["interaction_counts"] = f"""
+            SELECT user_id, product_id, COUNT(interaction_type) AS interaction_count
+            FROM {table}
+            WHERE created_at BETWEEN @start_date AND @end_date
+            GROUP BY user_id, product_id
+            """
+        queries["interaction_types"] = f"""
+        SELECT DISTINCT interaction_type
+        FROM {table}
+        WHERE created_at BETWEEN @start_date AND @end_date
+        AND interaction_type IS NOT NULL
+        """
+        
+        results = await asyncio.gather(*(
+            self._run_query(query, query_params) for query in queries.values()
+        ))
+        
+        return dict(zip(queries, results))
+
+    async def _get_interaction_counts(
+        self,
+        start_date: datetime,
+        end_date: datetime
+    ) -> pd.DataFrame:
+        """Per-pair interaction counts for the window, querying only new days.
+        
+        Completed days already in the aggregate state are read from disk.
+        Each run of consecutive missing days is queried as one range, and
+        completed days from the result are stored for later windows.
+        """
+        state = self.aggregate_state
+        # Day bounds are naive UTC, so the window must be too before comparing
+        start_date, end_date = to_naive_utc(start_date), to_naive_utc(end_date)
+        window = state.window_days(start_date, end_date)
+        stored = set(await asyncio.to_thread(state.days))
+        cached = [day for day, storable in window.items() if storable and day in stored]
+        
+        # Group missing days into contiguous ranges, clipped to the window
+        ranges = []
+        for day in window:
+            if day in cached:
+                continue
+            day_start = datetime.strptime(day, "%Y-%m-%d")
+            if ranges and ranges[-1]["end"] == day_start:
+                ranges[-1]["end"] = day_start + timedelta(days=1)
+                ranges[-1]["days"].append(day)
+            else:
+                ranges.append({
+                    "start": day_start,
+                    "end": day_start + timedelta(days=1),
+                    "days": [day]
+                })
+        
+        fresh = await asyncio.gather(*(
+            self._query_interaction_partials(
+                max(start_date, day_range["start"]),
+                min(end_date, day_range["end"] - timedelta(microseconds=1))
+            )
+            for day_range in ranges
+        ))
+        
+        # Store completed days, including empty ones, so they are not queried again
+        for day_range, partials in zip(ranges, fresh):
+            for day in day_range["days"]:
+                if window[day]:
+                    await asyncio.to_thread(
+                        state.write_day, day, partials[partials["day"] == day]
+                    )
+        
+        partials = [await asyncio.to_thread(state.read_days, cached), *fresh]
+        partials = [frame for frame in partials if not frame.empty]
+        counts = state.fold(
+            pd.concat(partials, ignore_index=True) if partials else pd.DataFrame(),
+            keys=["user_id", "product_id"],
+            sums=["interaction_count"],
+            maxes=["last_seen"]
+        )
+        
+        return counts[["user_id", "product_id", "interaction_count"]]
+
+    async def _query_interaction_partials(
+        self,
+        start_date: datetime,
+        end_date: datetime
+    ) -> pd.DataFrame:
+        """Aggregate interactions per pair and UTC day over a date range."""
+        query = f"""
+        SELECT
+            user_id,
+            product_id,
+            FORMAT_DATE('%Y-%m-%d', DATE(created_at)) AS day,
+            COUNT(interaction_type) AS interaction_count,
+            MAX(created_at) AS last_seen
+        FROM `{self.config['project_id']}.interactions.interaction_data`
+        WHERE created_at BETWEEN @start_date AND @end_date
+        GROUP BY user_id, product_id, day
+        """
+        
+        query_params = [
+            bigquery.ScalarQueryParameter("start_date", "TIMESTAMP", start_date),
+            bigquery.ScalarQueryParameter("end_date", "TIMESTAMP", end_date)
+        ]
+        
+        return await self._execute_query(query, query_params)
+
+    async def _run_query(
+        self,
+        query: str,
+        query_params: List[bigquery.ScalarQueryParameter]
+    ) -> bigquery.QueryJob:
+        """Run a query and return the job once it finishes."""
+        query_job = self.bq_client.query(
+            query,
+            job_config=bigquery.QueryJobConfig(query_parameters=query_params)
+        )
+        
+        # Waiting fetches no rows; each pass opens its own row iterator
+        await asyncio.to_thread(query_job.result)
+        return query_job
+
+    async def _iter_record_batches(
+        self,
+        query_job: bigquery.QueryJob
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """Yield Arrow record batches page by page without blocking the loop."""
+        rows = await asyncio.to_thread(
+            query_job.result,
+            page_size=self.config.get("extraction_page_size", 50000)
+        )
+        batches = iter(rows.to_arrow_iterable())
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                return
+            yield batch
@@ -0,0 +1,261 @@
+from typing import Any, Dict, Iterable, List, Optional, Set
+import glob
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+EVENT_TIMESTAMP = "event_timestamp"
+
+def to_utc(values):
+    """Timestamps as UTC-aware values; naive timestamps are taken to be UTC."""
+    return pd.to_datetime(values, utc=True)
+
+def point_in_time_join(
+    events: pd.DataFrame,
+    features: pd.DataFrame,
+    entity_key: str,
+    event_times: Iterable,
+    backfill: bool = False
+) -> pd.DataFrame:
+    """Attach to each event the latest feature row stamped at or before it.
+
+    ``features`` carries an ``event_timestamp`` column and ``event_times`` is
+    aligned with ``events`` by position; both are compared in UTC, so naive
+    and tz-aware timestamps can be mixed. Events with no earlier feature row
+    get NaNs, unless ``backfill`` is set, in which case they get the
+    entity's earliest row. Backfilled values come from after the event, so
+    only use it where that leakage is acceptable. Output rows keep the
+    order of ``events``.
+    """
+    if features.empty:
+        return events.reset_index(drop=True)
+
+    features = (
+        features.assign(**{EVENT_TIMESTAMP: to_utc(features[EVENT_TIMESTAMP])})
+        .sort_values(EVENT_TIMESTAMP, kind="stable")
+        .drop_duplicates([entity_key, EVENT_TIMESTAMP], keep="last")
+        .rename(columns={EVENT_TIMESTAMP: "_feature_time"})
+    )
+    left = events.assign(
+        _event_time=pd.DatetimeIndex(to_utc(event_times)),
+        _row=np.arange(len(events))
+    ).sort_values("_event_time", kind="stable")
+
+    joined = pd.merge_asof(
+        left,
+        features,
+        left_on="_event_time",
+        right_on="_feature_time",
+        by=entity_key,
+        direction="backward"
+    )
+    if backfill:
+        unmatched = joined["_feature_time"].isna().to_numpy()
+        if unmatched.any():
+            earliest = features.drop_duplicates(entity_key, keep="first").set_index(entity_key)
+            fill = earliest.reindex(joined.loc[unmatched, entity_key])
+            for column in features.columns.drop([entity_key, "_feature_time"]):
+                joined.loc[unmatched, column] = fill[column].to_numpy()
+    return (
+        joined.sort_values("_row")
+        .drop(columns=["_event_time", "_row", "_feature_time"])
+        .reset_index(drop=True)
+    )
+
+class LocalFeatureStore:
+    """File-backed feature store with an offline and an online view.
+
+    Offline rows are stored as Parquet files under
+    ``{root}/{entity}/date=YYYY-MM-DD/``, partitioned by the date of their
+    ``event_timestamp``. An entity-id index records which partitions hold
+    each id, so reads for a set of ids only open the matching partitions.
+    Every write also updates ``_latest.parquet``, which keeps the newest row
+    per entity. The online lookup reads from it, so serving uses exactly the
+    values that were materialised for training.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {}
+        self._online: Dict[str, pd.DataFrame] = {}
+
+    def _path(self, entity: str, *parts: str) -> str:
+        return os.path.join(self.root, entity, *parts)
+
+    def _write_parquet(self, frame: pd.DataFrame, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def _part_name(self) -> str:
+        # Names sort in write order so later writes win on identical timestamps
+        return f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+
+    def entity_key(self, entity: str) -> str:
+        with open(self._path(entity, "_meta.json")) as f:
+            return json.load(f)["entity_key"]
+
+    def partitions(self, entity: str) -> List[str]:
+        """Partition dates stored for ``entity`` in ascending order."""
+        return sorted(
+            os.path.basename(path)[len("date="):]
+            for path in glob.glob(self._path(entity, "date=*"))
+        )
+
+    def changed(
+        self,
+        entity: str,
+        features: pd.DataFrame,
+        entity_key: str
+    ) -> pd.DataFrame:
+        """Rows of ``features`` whose values differ from the entity's latest row."""
+        latest = self._latest(entity)
+        columns = [
+            column for column in features.columns
+            if column not in (entity_key, EVENT_TIMESTAMP)
+        ]
+        if latest.empty or not set(columns) <= set(latest.columns):
+            return features
+
+        previous = latest.reindex(features[entity_key])[columns].reset_index(drop=True)
+        current = features[columns].reset_index(drop=True)
+        unchanged = ((previous == current) | (previous.isna() & current.isna())).all(axis=1)
+        return features[~unchanged.to_numpy()]
+
+    def write(self, entity: str, features: pd.DataFrame, entity_key: str) -> int:
+        """Append timestamped feature rows and refresh the online view."""
+        features = features[features[EVENT_TIMESTAMP].notna()]
+        if features.empty:
+            return 0
+        # Stored in UTC so partitions and comparisons never mix timezones
+        features = features.assign(**{EVENT_TIMESTAMP: to_utc(features[EVENT_TIMESTAMP])})
+
+        os.makedirs(self._path(entity), exist_ok=True)
+        with open(self._path(entity, "_meta.json"), "w") as f:
+            json.dump({"entity_key": entity_key}, f)
+
+        index = self._load_index(entity)
+        dates = features[EVENT_TIMESTAMP].dt.strftime("%Y-%m-%d")
+        index_parts = []
+        for date, rows in features.groupby(dates, sort=True):
+            self._write_parquet(rows, self._path(entity, f"date={date}", self._part_name()))
+            index_parts.append(pd.DataFrame({
+                "entity_id": rows[entity_key].unique(),
+                "date": date
+            }))
+
+        # The index is append-only; new pairs go into their own part file
+        new_index = pd.concat(index_parts, ignore_index=True)
+        self._write_parquet(new_index, self._path(entity, "_index", self._part_name()))
+        for entity_id, date in zip(new_index["entity_id"], new_index["date"]):
+            index.setdefault(entity_id, set()).add(date)
+
+        self._update_online(entity, features, entity_key)
+        return len(features)
+
+    def _load_index(self, entity: str) -> Dict[Any, Set[str]]:
+        if entity not in self._indexes:
+            index: Dict[Any, Set[str]] = {}
+            for path in sorted(glob.glob(self._path(entity, "_index", "*.parquet"))):
+                part = pd.read_parquet(path)
+                for entity_id, date in zip(part["entity_id"], part["date"]):
+                    index.setdefault(entity_id, set()).add(date)
+            self._indexes[entity] = index
+        return self._indexes[entity]
+
+    def read(
+        self,
+        entity: str,
+        entity_ids: Optional[Iterable] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> pd.DataFrame:
+        """Read offline rows, pruning partitions by id and time range."""
+        start_time = to_utc(start_time) if start_time is not None else None
+        end_time = to_utc(end_time) if end_time is not None else None
+        dates = self.partitions(entity)
+        if entity_ids is not None:
+            entity_ids = set(entity_ids)
+            index = self._load_index(entity)
+            wanted: Set[str] = set()
+            for entity_id in entity_ids:
+                wanted |= index.get(entity_id, set())
+            dates = [date for date in dates if date in wanted]
+        if start_time is not None:
+            dates = [date for date in dates if date >= start_time.strftime("%Y-%m-%d")]
+        if end_time is not None:
+            dates = [date for date in dates if date <= end_time.strftime("%Y-%m-%d")]
+
+        paths = [
+            path
+            for date in dates
+            for path in sorted(glob.glob(self._path(entity, f"date={date}", "*.parquet")))
+        ]
+        if not paths:
+            return pd.DataFrame()
+
+        frame = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+        frame[EVENT_TIMESTAMP] = to_utc(frame[EVENT_TIMESTAMP])
+        if entity_ids is not None:
+            frame = frame[frame[self.entity_key(entity)].isin(entity_ids)]
+        if start_time is not None:
+            frame = frame[frame[EVENT_TIMESTAMP] >= start_time]
+        if end_time is not None:
+            frame = frame[frame[EVENT_TIMESTAMP] <= end_time]
+        return frame.reset_index(drop=True)
+
+    def join(
+        self,
+        events: pd.DataFrame,
+        entity: str,
+        event_times: Iterable,
+        backfill: bool = False
+    ) -> pd.DataFrame:
+        """Point-in-time join ``entity`` features onto ``events``.
+
+        See ``point_in_time_join`` for ``backfill``.
+        """
+        if not os.path.exists(self._path(entity, "_meta.json")):
+            return events.reset_index(drop=True)
+
+        entity_key = self.entity_key(entity)
+        features = self.read(
+            entity,
+            entity_ids=events[entity_key].unique(),
+            # Backfilling needs rows stamped after the last event too
+            end_time=None if backfill else to_utc(event_times).max()
+        )
+        return point_in_time_join(events, features, entity_key, event_times, backfill)
+
+    def _update_online(self, entity: str, features: pd.DataFrame, entity_key: str):
+        latest = features.set_index(entity_key)
+        if not self._latest(entity).empty:
+            latest = pd.concat([self._latest(entity), latest])
+            latest[EVENT_TIMESTAMP] = to_utc(latest[EVENT_TIMESTAMP])
+        latest = (
+            latest.sort_values(EVENT_TIMESTAMP, kind="stable")
+            .groupby(level=0)
+            .tail(1)
+        )
+        self._write_parquet(latest.reset_index(), self._path(entity, "_latest.parquet"))
+        self._online[entity] = latest
+
+    def _latest(self, entity: str) -> pd.DataFrame:
+        if entity not in self._online:
+            path = self._path(entity, "_latest.parquet")
+            if os.path.exists(path):
+                self._online[entity] = pd.read_parquet(path).set_index(self.entity_key(entity))
+            else:
+                self._online[entity] = pd.DataFrame()
+        return self._online[entity]
+
+    def get_online_features(self, entity: str, entity_ids: Iterable) -> Dict[Any, Dict]:
+        """Return the newest materialised feature row for each known id."""
+        latest = self._latest(entity)
+        found = [entity_id for entity_id in entity_ids if entity_id in latest.index]
+        return latest.loc[found].to_dict("index")
@@ -0,0 +1,245 @@
+from typing import Dict, List, Optional, Sequence
+import json
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy import sparse
+from google.cloud import bigquery
+
+class FeatureSetWriter:
+    """Bulk writer for feature sets using chunked Parquet files.
+
+    The DataFrame is converted to Arrow a chunk at a time and streamed into a
+    single Parquet file, so no per-row Python objects are created. ``open``
+    does the same for feature sets that arrive as a stream of DataFrames.
+    Online, the file is loaded into BigQuery with one load job. Offline, when
+    ``local_path`` is set, the file is written there instead.
+
+    Sparse features are passed as a CSR matrix aligned with the DataFrame's
+    rows and are never densified. Each row's non-zeros are stored in two
+    list columns, and the sparse column names are kept in the file metadata.
+    """
+
+    SPARSE_INDICES = "sparse_feature_indices"
+    SPARSE_VALUES = "sparse_feature_values"
+
+    def __init__(
+        self,
+        bq_client: Optional[bigquery.Client] = None,
+        chunk_rows: int = 100000,
+        local_path: Optional[str] = None
+    ):
+        self.bq_client = bq_client
+        self.chunk_rows = chunk_rows
+        self.local_path = local_path
+
+    @property
+    def offline(self) -> bool:
+        return self.local_path is not None
+
+    def open(
+        self,
+        table_id: str,
+        schema: Optional[pa.Schema] = None,
+        sparse_columns: Optional[Sequence[str]] = None
+    ) -> "FeatureSetFile":
+        """Start a feature set that is written one chunk at a time.
+        
+        ``schema`` fixes the dense column types up front; without it they
+        are inferred from the first chunk. Passing ``sparse_columns`` adds
+        the sparse list columns even if early chunks have no sparse data.
+        """
+        return FeatureSetFile(self, table_id, schema, sparse_columns)
+
+    def write(
+        self,
+        table_id: str,
+        features: pd.DataFrame,
+        sparse_features: Optional[sparse.csr_matrix] = None,
+        sparse_columns: Sequence[str] = (),
+        schema: Optional[pa.Schema] = None
+    ) -> Dict[str, float]:
+        """Write ``features`` to ``table_id`` and return throughput stats."""
+        out = self.open(table_id, schema)
+        try:
+            out.append(features, sparse_features, sparse_columns)
+        except BaseException:
+            out.abort()
+            raise
+        return out.close()
+
+    def _load(self, table_id: str, path: str):
+        # Load the sparse list columns as REPEATED fields, not list-of-struct
+        parquet_options = bigquery.ParquetOptions()
+        parquet_options.enable_list_inference = True
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+            parquet_options=parquet_options
+        )
+        with open(path, "rb") as f:
+            load_job = self.bq_client.load_table_from_file(
+                f, table_id, job_config=job_config
+            )
+        load_job.result()
+
+class FeatureSetFile:
+    """A feature set streamed into one Parquet file, chunk by chunk.
+
+    The file schema is given up front or inferred from the first chunk, and
+    every chunk is cast to it, so an integer column that picks up missing
+    values later is written as nulls instead of failing. Columns that are
+    entirely null in the first chunk are typed as float64. ``close``
+    finishes the file and loads or moves it into place; ``abort`` discards
+    it.
+    """
+
+    def __init__(
+        self,
+        writer: FeatureSetWriter,
+        table_id: str,
+        schema: Optional[pa.Schema] = None,
+        sparse_columns: Optional[Sequence[str]] = None
+    ):
+        self.writer = writer
+        self.table_id = table_id
+        self.rows = 0
+        self.columns: List[str] = []
+        self._started_at = time.perf_counter()
+        self._parquet: Optional[pq.ParquetWriter] = None
+        self._dense_schema = schema
+        self._sparse_columns = None if sparse_columns is None else list(sparse_columns)
+        self._tmp_dir = None
+
+        if writer.offline:
+            os.makedirs(writer.local_path, exist_ok=True)
+            self.path = os.path.join(writer.local_path, f"{table_id}.parquet")
+            # Write beside the target and swap in so readers never see a partial file
+            self._part_path = f"{self.path}.tmp"
+        else:
+            self._tmp_dir = tempfile.TemporaryDirectory()
+            self.path = os.path.join(self._tmp_dir.name, "features.parquet")
+            self._part_path = self.path
+
+    def append(
+        self,
+        features: pd.DataFrame,
+        sparse_features: Optional[sparse.csr_matrix] = None,
+        sparse_columns: Sequence[str] = ()
+    ):
+        if self._parquet is None:
+            if self._sparse_columns is None and sparse_features is not None:
+                self._sparse_columns = list(sparse_columns)
+            self._open(features)
+        elif sparse_features is not None and self._sparse_columns is None:
+            raise ValueError(
+                "Sparse features first appeared after the file was started; "
+                "pass sparse_columns when opening the feature set"
+            )
+
+        for start in range(0, len(features), self.writer.chunk_rows):
+            stop = start + self.writer.chunk_rows
+            table = self._to_table(features.iloc[start:stop])
+            if self._sparse_columns is not None:
+                if sparse_features is None:
+                    # Rows without sparse data get empty lists
+                    matrix = sparse.csr_matrix(
+                        (table.num_rows, len(self._sparse_columns)), dtype=np.float32
+                    )
+                else:
+                    matrix = sparse_features[start:stop]
+                table = self._append_sparse(table, matrix)
+            self._parquet.write_table(table)
+        self.rows += len(features)
+
+    def _open(self, first_chunk: pd.DataFrame):
+        # One schema for every chunk so columns never change type mid-file
+        if self._dense_schema is None:
+            self._dense_schema = self._infer_schema(first_chunk)
+        schema = self._dense_schema
+        self.columns = list(schema.names)
+        if self._sparse_columns is not None:
+            schema = schema.append(pa.field(FeatureSetWriter.SPARSE_INDICES, pa.list_(pa.int32())))
+            schema = schema.append(pa.field(FeatureSetWriter.SPARSE_VALUES, pa.list_(pa.float32())))
+            schema = schema.with_metadata({
+                **(schema.metadata or {}),
+                b"sparse_feature_columns": json.dumps(self._sparse_columns).encode()
+            })
+            self.columns += self._sparse_columns
+        self._parquet = pq.ParquetWriter(self._part_path, schema)
+
+    @staticmethod
+    def _infer_schema(dense: pd.DataFrame) -> pa.Schema:
+        schema = pa.Schema.from_pandas(dense, preserve_index=False)
+        # An all-null column has no type yet; feature columns are numeric
+        for i, field in enumerate(schema):
+            if pa.types.is_null(field.type):
+                schema = schema.set(i, field.with_type(pa.float64()))
+        return schema
+
+    def _to_table(self, dense: pd.DataFrame) -> pa.Table:
+        """Convert a chunk and cast each column to the file's dense schema."""
+        schema = self._dense_schema
+        table = pa.Table.from_pandas(dense, preserve_index=False)
+        if set(table.column_names) != set(schema.names):
+            raise ValueError(
+                f"Chunk columns {sorted(table.column_names)} do not match "
+                f"the feature set columns {sorted(schema.names)}"
+            )
+        try:
+            return pa.Table.from_arrays(
+                [table.column(field.name).cast(field.type) for field in schema],
+                schema=schema
+            )
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ValueError(f"Chunk does not fit the feature set schema: {e}") from e
+
+    def _append_sparse(self, table: pa.Table, matrix: sparse.csr_matrix) -> pa.Table:
+        """Append CSR rows as per-row index and value lists."""
+        offsets = pa.array(matrix.indptr.astype(np.int32))
+        table = table.append_column(
+            FeatureSetWriter.SPARSE_INDICES,
+            pa.ListArray.from_arrays(offsets, pa.array(matrix.indices.astype(np.int32)))
+        )
+        return table.append_column(
+            FeatureSetWriter.SPARSE_VALUES,
+            pa.ListArray.from_arrays(offsets, pa.array(matrix.data.astype(np.float32)))
+        )
+
+    def close(self) -> Dict[str, float]:
+        """Finish the file, load or move it into place and return throughput stats."""
+        try:
+            num_bytes = 0
+            if self._parquet is not None:
+                self._parquet.close()
+                self._parquet = None
+                if self.writer.offline:
+                    os.replace(self._part_path, self.path)
+                num_bytes = os.path.getsize(self.path)
+                if not self.writer.offline:
+                    self.writer._load(self.table_id, self.path)
+        finally:
+            self.abort()
+
+        elapsed = time.perf_counter() - self._started_at
+        return {
+            "rows": self.rows,
+            "bytes": num_bytes,
+            "seconds": elapsed,
+            "rows_per_sec": self.rows / max(elapsed, 1e-9)
+        }
+
+    def abort(self):
+        """Discard anything written that has not been moved into place."""
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+        if self.writer.offline and os.path.exists(self._part_path):
+            os.remove(self._part_path)
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
@@ -0,0 +1,88 @@
+from typing import List, Optional, Tuple
+import numpy as np
+import tensorflow as tf
+
+def _relu(x: np.ndarray) -> np.ndarray:
+    return np.maximum(x, 0.0)
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+def _linear(x: np.ndarray) -> np.ndarray:
+    return x
+
+_ACTIVATIONS = {
+    "relu": _relu,
+    "sigmoid": _sigmoid,
+    "tanh": np.tanh,
+    "linear": _linear
+}
+
+class DenseForward:
+    """Pure-NumPy forward pass for small Keras MLPs made of Dense layers.
+
+    Dropout layers are skipped since they are identity at inference time.
+    Calling this on a single row avoids the fixed per-call overhead of
+    ``model.predict``.
+    """
+
+    def __init__(self, layers: List[Tuple[np.ndarray, np.ndarray, str]]):
+        self.layers = [
+            (
+                np.ascontiguousarray(kernel, dtype=np.float32),
+                np.ascontiguousarray(bias, dtype=np.float32),
+                _ACTIVATIONS[activation]
+            )
+            for kernel, bias, activation in layers
+        ]
+
+    @classmethod
+    def from_keras(cls, model: tf.keras.Model) -> "DenseForward":
+        """Export weights from a built Sequential model of Dense/Dropout layers."""
+        if not model.built:
+            raise ValueError("Model must be built before exporting its weights")
+
+        layers = []
+        for layer in model.layers:
+            if isinstance(layer, tf.keras.layers.Dropout):
+                continue
+            if not isinstance(layer, tf.keras.layers.Dense):
+                raise ValueError(f"Unsupported layer for NumPy export: {layer.name}")
+
+            activation = tf.keras.activations.serialize(layer.activation)
+            if activation not in _ACTIVATIONS:
+                raise ValueError(f"Unsupported activation for NumPy export: {activation}")
+
+            kernel, bias = layer.get_weights()
+            layers.append((kernel, bias, activation))
+
+        return cls(layers)
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            x = activation(x @ kernel + bias)
+        return x
+
+class CompiledModel:
+    """Inference handle that serves a Keras MLP through ``DenseForward``.
+
+    Weights are exported lazily on the first call. Call ``refresh`` after the
+    underlying model is trained so the exported weights follow it.
+    """
+
+    def __init__(self, model: tf.keras.Model):
+        self.model = model
+        self._forward: Optional[DenseForward] = None
+
+    def refresh(self):
+        """Re-export the current Keras weights, or on first call if unbuilt."""
+        self._forward = DenseForward.from_keras(self.model) if self.model.built else None
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        if self._forward is None:
+            if not self.model.built:
+                # Building the model needs one Keras call to create weights
+                self.model(np.asarray(x, dtype=np.float32), training=False)
+            self.refresh()
+        return self._forward(x)
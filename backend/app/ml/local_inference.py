@@ -0,0 +1,131 @@
+from typing import List, Optional, Sequence
+import hashlib
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import Model
+from .embedding_store import ProductEmbeddingStore
+
+class LocalTwoTowerEndpoint:
+    """In-process stand-in for the Vertex endpoint serving the two-tower model.
+
+    The Keras model is split into its user and product towers. Product
+    embeddings for a catalog are computed once with ``index_catalog``; after
+    that a user is scored against the whole catalog with one matrix-vector
+    product followed by the model's scalar ``Dense(1, sigmoid)`` head.
+    """
+
+    def __init__(self, model: Model, batch_size: int = 4096):
+        self.batch_size = batch_size
+        self.user_tower = Model(
+            inputs=model.inputs[0],
+            outputs=model.get_layer("user_embedding").output
+        )
+        self.product_tower = Model(
+            inputs=model.inputs[1],
+            outputs=model.get_layer("product_embedding").output
+        )
+
+        # The head is sigmoid(w * dot(user, product) + b) with scalar w, b
+        kernel, bias = self._score_layer(model).get_weights()
+        self.scale = np.float32(kernel[0, 0])
+        self.bias = np.float32(bias[0])
+
+        self.product_embeddings: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _score_layer(model: Model) -> tf.keras.layers.Layer:
+        # Models exported before the head was named "score" end in it unnamed
+        try:
+            return model.get_layer("score")
+        except ValueError:
+            return model.layers[-1]
+
+    @classmethod
+    def from_saved_model(cls, path: str, batch_size: int = 4096) -> "LocalTwoTowerEndpoint":
+        """Load an exported Keras SavedModel and wrap it."""
+        return cls(tf.keras.models.load_model(path), batch_size=batch_size)
+
+    def embed_users(self, user_features: np.ndarray) -> np.ndarray:
+        """Run only the user tower."""
+        user_features = np.atleast_2d(np.asarray(user_features, dtype=np.float32))
+        return self.user_tower(user_features, training=False).numpy()
+
+    def embed_products(self, product_features: np.ndarray) -> np.ndarray:
+        """Run only the product tower, in batches."""
+        product_features = np.asarray(product_features, dtype=np.float32)
+        return self.product_tower.predict(
+            product_features,
+            batch_size=self.batch_size,
+            verbose=0
+        )
+
+    def index_catalog(self, product_features: np.ndarray) -> np.ndarray:
+        """Precompute product tower embeddings for the whole catalog."""
+        self.product_embeddings = np.ascontiguousarray(
+            self.embed_products(product_features),
+            dtype=np.float32
+        )
+        return self.product_embeddings
+
+    def refresh_catalog(
+        self,
+        product_ids: Sequence[str],
+        product_features: np.ndarray,
+        cache: ProductEmbeddingStore
+    ) -> int:
+        """Load catalog embeddings from ``cache``, recomputing only changed rows.
+
+        Rows are keyed by a hash of each product's feature vector, so only new
+        products and products whose features changed go through the tower.
+        Returns the number of recomputed products.
+        """
+        product_features = np.ascontiguousarray(product_features, dtype=np.float32)
+        feature_hashes = [
+            ProductEmbeddingStore.content_hash(row.tobytes())
+            for row in product_features
+        ]
+        stale = set(cache.stale(dict(zip(product_ids, feature_hashes))))
+
+        changed = np.fromiter(
+            (product_id in stale for product_id in product_ids),
+            dtype=bool,
+            count=len(product_ids)
+        )
+        if changed.any():
+            cache.upsert(
+                [pid for pid, c in zip(product_ids, changed) if c],
+                [h for h, c in zip(feature_hashes, changed) if c],
+                self.embed_products(product_features[changed])
+            )
+            cache.flush()
+
+        self.product_embeddings, _ = cache.gather(product_ids)
+        return int(changed.sum())
+
+    def model_fingerprint(self) -> str:
+        """Hash of the product tower weights, used to version cached embeddings."""
+        digest = hashlib.sha1()
+        for weights in self.product_tower.get_weights():
+            digest.update(np.ascontiguousarray(weights).tobytes())
+        return digest.hexdigest()[:16]
+
+    def score_catalog(self, user_features: np.ndarray) -> np.ndarray:
+        """Score one user against every indexed product."""
+        if self.product_embeddings is None:
+            raise ValueError("index_catalog must be called before score_catalog")
+
+        user_embedding = self.embed_users(user_features)[0]
+        return self._head(self.product_embeddings @ user_embedding)
+
+    def predict(self, instances: List[np.ndarray]) -> np.ndarray:
+        """Endpoint-compatible scoring of ``[user_features, product_features]``."""
+        user_features, product_features = instances
+        user_embeddings = self.embed_users(user_features)
+        product_embeddings = self.embed_products(product_features)
+
+        # A single user row is broadcast against every product row
+        dots = np.sum(user_embeddings * product_embeddings, axis=1)
+        return self._head(dots)
+
+    def _head(self, dots: np.ndarray) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-(self.scale * dots + self.bias)))
@@ -0,0 +1,287 @@
+from typing import Dict, List, Optional, Tuple
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import queue
+import time
+import numpy as np
+import torch
+from .config import PricingConfig
+from .pricing_simulator import MarketSimulator
+
+# Blocks per worker: one being filled while the learner drains the other
+SLOTS_PER_WORKER = 2
+
+class SharedArrays:
+    """Named NumPy arrays packed into a single shared-memory segment."""
+
+    def __init__(self, specs: Dict[str, Tuple[tuple, str]], name: Optional[str] = None):
+        self.specs = specs
+
+        layout = []
+        offset = 0
+        for field, (shape, dtype) in specs.items():
+            dtype = np.dtype(dtype)
+            layout.append((field, shape, dtype, offset))
+            nbytes = int(np.prod(shape)) * dtype.itemsize
+            offset += (nbytes + 7) // 8 * 8
+
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=name is None, size=max(offset, 1)
+        )
+        self.arrays = {
+            field: np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=start)
+            for field, shape, dtype, start in layout
+        }
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        # Views must be dropped before the mapping can be released
+        self.arrays = {}
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+def transition_specs(rows: int, state_dim: int) -> Dict[str, Tuple[tuple, str]]:
+    return {
+        "states": ((rows, state_dim), "float32"),
+        "actions": ((rows,), "int64"),
+        "rewards": ((rows,), "float32"),
+        "next_states": ((rows, state_dim), "float32"),
+        "dones": ((rows,), "float32")
+    }
+
+def weight_specs(model: torch.nn.Module) -> Dict[str, Tuple[tuple, str]]:
+    return {
+        name: (tuple(tensor.shape), "float32")
+        for name, tensor in model.state_dict().items()
+    }
+
+def _rollout_worker(
+    worker_id: int,
+    config: PricingConfig,
+    slot_names: List[str],
+    weights_name: str,
+    weights_lock,
+    weights_version,
+    free_slots,
+    filled,
+    stop,
+    n_products: int,
+    rollout_steps: int,
+    epsilon: float,
+    seed: int
+):
+    """Fill free transition blocks with epsilon-greedy simulator rollouts."""
+    # Imported here because the pricing module imports this one
+    from .pricing import DQNPricingModel
+
+    # Workers parallelise across processes, not threads
+    torch.set_num_threads(1)
+    rng = np.random.default_rng(seed)
+    torch.manual_seed(seed)
+
+    model = DQNPricingModel(config)
+    model.eval()
+    rows = n_products * rollout_steps
+    slots = [
+        SharedArrays(transition_specs(rows, config.state_dim), name)
+        for name in slot_names
+    ]
+    weights = SharedArrays(weight_specs(model), weights_name)
+
+    simulator = MarketSimulator(n_products, config.state_dim, seed=seed)
+    states = simulator.reset()
+    version = -1
+
+    try:
+        while not stop.is_set():
+            try:
+                slot_id = free_slots.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            # Pick up the learner's latest policy before acting
+            if weights_version.value != version:
+                with weights_lock:
+                    version = weights_version.value
+                    model.load_state_dict({
+                        name: torch.from_numpy(array.copy())
+                        for name, array in weights.arrays.items()
+                    })
+
+            block = slots[slot_id].arrays
+            for step in range(rollout_steps):
+                window = slice(step * n_products, (step + 1) * n_products)
+
+                with torch.no_grad():
+                    greedy = model(torch.from_numpy(states)).argmax(dim=1).numpy()
+                explore = rng.random(n_products) < epsilon
+                actions = np.where(
+                    explore, rng.integers(0, config.action_dim, n_products), greedy
+                )
+
+                # Same mapping as DynamicPricingAgent.action_to_adjustment
+                adjustments = (actions - config.action_dim // 2) / 100
+                next_states, rewards, dones, _ = simulator.step(adjustments)
+
+                block["states"][window] = states
+                block["actions"][window] = actions
+                block["rewards"][window] = rewards
+                block["next_states"][window] = next_states
+                block["dones"][window] = dones
+
+                states = simulator.observe() if dones[0] else next_states
+
+            filled.put((worker_id, slot_id, rows))
+    finally:
+        for slot in slots:
+            slot.close()
+        weights.close()
+
+class LocalPricingTrainer:
+    """Trains a DynamicPricingAgent from parallel simulator rollouts on one machine.
+
+    Rollout workers run in separate processes, each with its own
+    MarketSimulator and a copy of the policy network. Experience moves through
+    shared-memory blocks: a worker fills a free block and posts its index,
+    the learner copies the block into the agent's replay buffer and hands it
+    back. Only small tuples go through queues. After each round of
+    ``update_model`` calls the learner publishes its weights to a shared
+    segment that workers reload before their next rollout. Target network
+    sync stays in ``update_model``, driven by ``update_target_steps``.
+    """
+
+    def __init__(
+        self,
+        agent,
+        n_workers: Optional[int] = None,
+        n_products: Optional[int] = None,
+        rollout_steps: Optional[int] = None,
+        updates_per_rollout: Optional[int] = None,
+        epsilon: float = 0.1,
+        seed: int = 0
+    ):
+        config = agent.config
+        self.agent = agent
+        self.n_workers = n_workers or config.local_workers
+        self.n_products = n_products or config.rollout_products
+        self.rollout_steps = rollout_steps or config.rollout_steps
+        self.updates_per_rollout = updates_per_rollout or config.updates_per_rollout
+        self.epsilon = epsilon
+        self.seed = seed
+
+    def _publish_weights(self, weights: SharedArrays, lock, version):
+        with lock:
+            for name, tensor in self.agent.model.state_dict().items():
+                weights.arrays[name][...] = tensor.detach().cpu().numpy()
+            version.value += 1
+
+    def _next_rollout(self, filled, processes) -> Tuple[int, int, int]:
+        while True:
+            try:
+                return filled.get(timeout=1.0)
+            except queue.Empty:
+                if not all(process.is_alive() for process in processes):
+                    raise RuntimeError("Rollout worker exited unexpectedly")
+
+    def train(self, n_rollouts: int) -> Dict[str, float]:
+        """Run until ``n_rollouts`` worker rollouts have been learned from."""
+        config = self.agent.config
+        rows = self.n_products * self.rollout_steps
+        # Spawn rather than fork so workers don't inherit torch thread state
+        ctx = mp.get_context("spawn")
+
+        weights = SharedArrays(weight_specs(self.agent.model))
+        slots = [
+            [SharedArrays(transition_specs(rows, config.state_dim)) for _ in range(SLOTS_PER_WORKER)]
+            for _ in range(self.n_workers)
+        ]
+        weights_lock = ctx.Lock()
+        weights_version = ctx.Value("i", 0)
+        self._publish_weights(weights, weights_lock, weights_version)
+
+        free_slots = [ctx.Queue() for _ in range(self.n_workers)]
+        for worker_queue in free_slots:
+            for slot_id in range(SLOTS_PER_WORKER):
+                worker_queue.put(slot_id)
+        filled = ctx.Queue()
+        stop = ctx.Event()
+
+        processes = [
+            ctx.Process(
+                target=_rollout_worker,
+                args=(
+                    worker_id,
+                    config,
+                    [slot.name for slot in slots[worker_id]],
+                    weights.name,
+                    weights_lock,
+                    weights_version,
+                    free_slots[worker_id],
+                    filled,
+                    stop,
+                    self.n_products,
+                    self.rollout_steps,
+                    self.epsilon,
+                    self.seed + worker_id
+                ),
+                daemon=True
+            )
+            for worker_id in range(self.n_workers)
+        ]
+
+        total_reward = 0.0
+        loss = 0.0
+        update_time = 0.0
+        started_at = time.perf_counter()
+
+        try:
+            for process in processes:
+                process.start()
+
+            for _ in range(n_rollouts):
+                worker_id, slot_id, n = self._next_rollout(filled, processes)
+                block = slots[worker_id][slot_id].arrays
+
+                # add_batch copies, so the block can be handed straight back
+                self.agent.memory.add_batch(
+                    block["states"][:n],
+                    block["actions"][:n],
+                    block["rewards"][:n],
+                    block["next_states"][:n],
+                    block["dones"][:n]
+                )
+                total_reward += float(block["rewards"][:n].sum())
+                free_slots[worker_id].put(slot_id)
+
+                update_started_at = time.perf_counter()
+                for _ in range(self.updates_per_rollout):
+                    loss = self.agent.update_model()
+                update_time += time.perf_counter() - update_started_at
+
+                self._publish_weights(weights, weights_lock, weights_version)
+        finally:
+            stop.set()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+            for shared in [weights] + [slot for worker in slots for slot in worker]:
+                shared.close()
+                shared.unlink()
+
+        elapsed = time.perf_counter() - started_at
+        transitions = n_rollouts * rows
+        return {
+            "rollouts": n_rollouts,
+            "transitions": transitions,
+            "transitions_per_sec": transitions / elapsed,
+            "updates_per_sec": n_rollouts * self.updates_per_rollout / max(update_time, 1e-9),
+            "mean_reward": total_reward / max(transitions, 1),
+            "final_loss": float(loss)
+        }
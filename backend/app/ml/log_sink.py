@@ -0,0 +1,278 @@
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+import asyncio
+import glob
+import json
+import os
+import time
+from datetime import datetime
+
+class BatchedLogSink:
+    """Background sink that buffers log rows and writes them in bulk.
+
+    Rows are appended to an in-memory ring buffer and flushed by a background
+    task whenever ``max_batch_size`` rows are waiting or ``flush_interval``
+    seconds have passed. ``put`` blocks once ``max_buffer`` rows are pending,
+    which pushes back on producers instead of growing without bound.
+    Serialisation and the blocking ``write_fn`` call happen in a worker
+    thread. Batches that fail to write are appended to a local JSONL spool
+    file and replayed after the next successful write, at most
+    ``max_replay_rows`` per flush. Rows still rejected after
+    ``max_replay_attempts`` replays are moved to a dead-letter file.
+
+    Replay never rewrites the spool. The spool file is sealed into a segment
+    and read from a byte offset that is saved after each replayed batch.
+    A segment is deleted once it has been read to the end. A crash can
+    replay a row twice but never loses one.
+    """
+
+    def __init__(
+        self,
+        write_fn: Callable[[List[Dict]], List],
+        name: str,
+        max_batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_buffer: int = 10000,
+        spool_path: Optional[str] = None,
+        dead_letter_path: Optional[str] = None,
+        max_replay_rows: int = 10000,
+        max_replay_attempts: int = 5,
+        monitoring=None
+    ):
+        self.write_fn = write_fn
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.spool_path = spool_path
+        self.dead_letter_path = dead_letter_path or (
+            f"{spool_path}.dead" if spool_path else None
+        )
+        self.max_replay_rows = max_replay_rows
+        self.max_replay_attempts = max_replay_attempts
+        self.monitoring = monitoring
+
+        self._buffer: Deque[Dict] = deque()
+        self._condition: Optional[asyncio.Condition] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+
+        if spool_path:
+            self._recover_replay_file()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def put(self, row: Dict):
+        """Queue a row, waiting while the buffer is full."""
+        self._ensure_worker()
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: len(self._buffer) < self.max_buffer
+            )
+            self._buffer.append(row)
+            if len(self._buffer) >= self.max_batch_size:
+                self._condition.notify_all()
+
+    async def close(self):
+        """Flush everything still buffered and stop the background task."""
+        if self._worker is None:
+            return
+
+        async with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        await self._worker
+        self._worker = None
+        self._closing = False
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._condition = asyncio.Condition()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            async with self._condition:
+                try:
+                    await asyncio.wait_for(
+                        self._condition.wait_for(
+                            lambda: self._closing
+                            or len(self._buffer) >= self.max_batch_size
+                        ),
+                        timeout=self.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+                n_rows = min(len(self._buffer), self.max_batch_size)
+                rows = [self._buffer.popleft() for _ in range(n_rows)]
+                done = self._closing and not self._buffer
+
+                # Wake producers blocked on a full buffer
+                self._condition.notify_all()
+
+            if rows:
+                await self._flush(rows)
+            if done:
+                return
+
+    async def _flush(self, rows: List[Dict]):
+        try:
+            errors = await asyncio.to_thread(self._write, rows)
+        except Exception as e:
+            errors = [str(e)]
+
+        if errors and self.monitoring is not None:
+            await self.monitoring.log_error(
+                Exception(f"Failed to write {self.name} rows: {errors}"),
+                {
+                    "service": "log_sink",
+                    "operation": "flush",
+                    "sink": self.name,
+                    "row_count": len(rows),
+                    "spooled": self.spool_path is not None
+                }
+            )
+
+    def _write(self, rows: List[Dict]) -> List:
+        """Serialise and write a batch; runs in a worker thread."""
+        # Round-trip through JSON so numpy values and datetimes are accepted
+        rows = json.loads(json.dumps(rows, default=_json_default))
+
+        try:
+            errors = self.write_fn(rows)
+        except Exception as e:
+            errors = [str(e)]
+
+        if errors:
+            self._spool(rows)
+            return errors
+
+        self._replay_spool()
+        return []
+
+    def _spool(self, rows: List[Dict]):
+        if not self.spool_path:
+            return
+        self._append(self.spool_path, [{"attempts": 0, "row": row} for row in rows])
+
+    def _append(self, path: str, records: List[Dict]):
+        if not records:
+            return
+        with open(path, "a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    def _try_write(self, rows: List[Dict]) -> bool:
+        try:
+            return not self.write_fn(rows)
+        except Exception:
+            return False
+
+    def _segments(self) -> List[str]:
+        """Sealed spool segments, oldest first."""
+        return sorted(glob.glob(f"{self.spool_path}.seg-*"))
+
+    def _seal_spool(self) -> Optional[str]:
+        if not os.path.exists(self.spool_path) or os.path.getsize(self.spool_path) == 0:
+            return None
+        segment = f"{self.spool_path}.seg-{time.time_ns():020d}"
+        os.replace(self.spool_path, segment)
+        return segment
+
+    def _recover_replay_file(self):
+        # Earlier versions moved the spool to ``.replay`` while replaying it;
+        # a crash left rows there that nothing else would read
+        replay_path = f"{self.spool_path}.replay"
+        if os.path.exists(replay_path):
+            os.replace(replay_path, f"{self.spool_path}.seg-{time.time_ns():020d}")
+
+    def _read_offset(self, segment: str) -> int:
+        try:
+            with open(f"{self.spool_path}.offset") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        return saved["offset"] if saved.get("segment") == os.path.basename(segment) else 0
+
+    def _save_offset(self, segment: str, offset: int):
+        offset_path = f"{self.spool_path}.offset"
+        tmp_path = f"{offset_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"segment": os.path.basename(segment), "offset": offset}, f)
+        os.replace(tmp_path, offset_path)
+
+    def _replay_spool(self):
+        """Retry spooled rows now that the destination accepts writes again."""
+        if not self.spool_path:
+            return
+
+        segments = self._segments() or [self._seal_spool()]
+        budget = self.max_replay_rows
+        for segment in segments:
+            if segment is None or budget <= 0:
+                return
+            budget = self._replay_segment(segment, budget)
+
+    def _replay_segment(self, segment: str, budget: int) -> int:
+        """Replay up to ``budget`` rows from ``segment`` and return what is left.
+
+        Returns 0 when a batch fails, so replay stops until the next flush.
+        """
+        offset = self._read_offset(segment)
+        records, ends = [], []
+        with open(segment, "rb") as f:
+            f.seek(offset)
+            while len(records) < budget:
+                line = f.readline()
+                if not line:
+                    break
+                if line.strip():
+                    records.append(_spool_record(json.loads(line)))
+                    ends.append(f.tell())
+
+        for i in range(0, len(records), self.max_batch_size):
+            batch = records[i:i + self.max_batch_size]
+            end = ends[i + len(batch) - 1]
+            if self._try_write([record["row"] for record in batch]):
+                self._save_offset(segment, end)
+                continue
+
+            for record in batch:
+                record["attempts"] += 1
+            exhausted = [
+                record for record in batch
+                if record["attempts"] >= self.max_replay_attempts
+            ]
+            # Retry exhausted rows one at a time so only the rejected ones are dropped
+            self._append(self.dead_letter_path, [
+                record for record in exhausted
+                if not self._try_write([record["row"]])
+            ])
+            # Failed rows go back to the live spool before the offset moves past them
+            self._append(self.spool_path, [
+                record for record in batch
+                if record["attempts"] < self.max_replay_attempts
+            ])
+            self._save_offset(segment, end)
+            return 0
+
+        if not records or ends[-1] >= os.path.getsize(segment):
+            os.remove(segment)
+            if os.path.exists(f"{self.spool_path}.offset"):
+                os.remove(f"{self.spool_path}.offset")
+        return budget - len(records)
+
+def _spool_record(record: Dict) -> Dict:
+    # Rows spooled before attempts were tracked are stored bare
+    if set(record) == {"attempts", "row"}:
+        return record
+    return {"attempts": 0, "row": record}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
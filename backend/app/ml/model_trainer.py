@@ -1,7 +1,7 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import asyncio
 from datetime import datetime, timedelta
-import pandas as pd
+from scipy import sparse
 from google.cloud import bigquery
 from .model_registry import ModelRegistry
 from .feature_engineering import FeatureEngineeringPipeline
@@ -23,8 +23,10 @@ class ModelTrainer:
     ) -> str:
         """Train a new model version."""
         try:
-            # Create feature set
-            features = await self.feature_pipeline.create_feature_set(
+            # Create feature set; model input is the sparse matrix the
+            # pipeline builds, so the text row index and id columns never
+            # reach the model
+            inputs, feature_columns = await self.feature_pipeline.create_training_matrix(
                 feature_set_name=f"{model_name}_training_data",
                 start_date=training_config["start_date"],
                 end_date=training_config["end_date"]
@@ -32,7 +34,7 @@ class ModelTrainer:
             
             # Split data
             train_data, val_data = self._split_data(
-                features,
+                inputs,
                 training_config["validation_split"]
             )
             
@@ -51,7 +53,8 @@ class ModelTrainer:
                 model_type=model_type,
                 model_artifacts={
                     "model": model,
-                    "feature_pipeline": self.feature_pipeline
+                    "feature_pipeline": self.feature_pipeline,
+                    "feature_columns": feature_columns
                 },
                 metrics=metrics,
                 parameters=training_config
@@ -306,9 +309,9 @@ class ModelTrainer:
 
     def _split_data(
         self,
-        data: pd.DataFrame,
+        data: sparse.csr_matrix,
         validation_split: float
-    ) -> tuple:
-        """Split data into training and validation sets."""
-        train_size = int(len(data) * (1 - validation_split))
+    ) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+        """Split rows into training and validation sets."""
+        train_size = int(data.shape[0] * (1 - validation_split))
         return data[:train_size], data[train_size:]
@@ -0,0 +1,43 @@
+from typing import Dict, Optional, Tuple
+from datetime import datetime
+
+class PriceTable:
+    """In-memory table of precomputed prices keyed by product and segment.
+
+    Readers do a single dict lookup against the current snapshot. A refresh
+    builds a complete new dict and swaps the reference in one assignment, so
+    readers never see a half-built table. Entries are handed out as copies
+    so callers cannot mutate the shared snapshot.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, str], Dict] = {}
+        self.built_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, product_id: str, segment: str) -> Optional[Dict]:
+        """Return the stored price if present and still within its validity window."""
+        entry = self._entries.get((product_id, segment))
+        if entry is None or entry["valid_until"] <= datetime.now():
+            return None
+        return dict(entry)
+
+    def swap(self, entries: Dict[Tuple[str, str], Dict], merge: bool = False):
+        """Atomically replace the table, optionally keeping entries not in ``entries``."""
+        if merge:
+            entries = {**self._entries, **entries}
+        self._entries = entries
+        self.built_at = datetime.now()
+
+    def evict(self, product_id: str):
+        """Drop every segment's entry for a product, e.g. after its price changed."""
+        self._entries = {
+            key: entry for key, entry in self._entries.items()
+            if key[0] != product_id
+        }
+
+    def clear(self):
+        """Drop all entries; requests are priced live until the next refresh."""
+        self._entries = {}
@@ -1,10 +1,12 @@
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 from google.cloud import aiplatform
 from .config import PricingConfig
+from .local_trainer import LocalPricingTrainer
+from .replay_buffer import PrioritizedReplayBuffer, ReplayBuffer
 
 class DQNPricingModel(nn.Module):
     def __init__(self, config: PricingConfig):
@@ -37,11 +39,27 @@ class DynamicPricingAgent:
             location=config.vertex_ai_region
         )
         
-        self.memory = []
+        self.memory = self._build_replay_buffer()
         self.batch_size = 64
         self.update_target_steps = 100
         self.steps = 0
     
+    def _build_replay_buffer(self) -> ReplayBuffer:
+        """Create the fixed-capacity replay buffer described by the config."""
+        if self.config.prioritized_replay:
+            return PrioritizedReplayBuffer(
+                self.config.replay_capacity,
+                self.config.state_dim,
+                alpha=self.config.per_alpha,
+                beta=self.config.per_beta
+            )
+        return ReplayBuffer(self.config.replay_capacity, self.config.state_dim)
+    
+    def remember(self, state: np.ndarray, action: int, reward: float,
+                 next_state: np.ndarray, done: bool) -> None:
+        """Store a transition in the replay buffer."""
+        self.memory.add(state, action, reward, next_state, done)
+    
     def get_state(self, product_id: str) -> np.ndarray:
         """Get current state for a product including market and demand features."""
         # Implement state feature extraction
@@ -64,31 +82,78 @@ class DynamicPricingAgent:
             price_adjustment = (action - self.config.action_dim // 2) / 100
             return price_adjustment
     
-    def update_model(self, batch: List[Tuple]) -> float:
-        """Update model weights using experience replay."""
-        if len(batch) < self.batch_size:
-            return 0.0
-            
-        # Unpack batch
-        states, actions, rewards, next_states, dones = zip(*batch)
+    def select_action_indices(self, states: np.ndarray, epsilon: float = 0.1,
+                              chunk_size: int = 65536) -> np.ndarray:
+        """Select epsilon-greedy action indices for a batch of states."""
+        states = np.ascontiguousarray(states, dtype=np.float32)
         
-        # Convert to tensors
-        states = torch.FloatTensor(states)
-        actions = torch.LongTensor(actions)
-        rewards = torch.FloatTensor(rewards)
-        next_states = torch.FloatTensor(next_states)
-        dones = torch.FloatTensor(dones)
+        # One forward pass per chunk instead of one per state
+        greedy = np.empty(len(states), dtype=np.int64)
+        with torch.no_grad():
+            for start in range(0, len(states), chunk_size):
+                q_values = self.model(torch.from_numpy(states[start:start + chunk_size]))
+                greedy[start:start + chunk_size] = q_values.argmax(dim=1).numpy()
+        
+        explore = np.random.random(len(states)) < epsilon
+        random_actions = np.random.randint(0, self.config.action_dim, size=len(states))
+        return np.where(explore, random_actions, greedy)
+    
+    def action_to_adjustment(self, actions: np.ndarray) -> np.ndarray:
+        """Convert action indices to relative price adjustments."""
+        return (np.asarray(actions) - self.config.action_dim // 2) / 100
+    
+    def select_actions(self, states: np.ndarray, epsilon: float = 0.1) -> np.ndarray:
+        """Select pricing adjustments for a batch of states."""
+        return self.action_to_adjustment(self.select_action_indices(states, epsilon))
+    
+    def update_model(self, batch: Optional[List[Tuple]] = None) -> float:
+        """Update model weights using experience replay.
+        
+        Samples from the replay buffer unless an explicit list of
+        ``(state, action, reward, next_state, done)`` tuples is given.
+        """
+        if batch is None:
+            if len(self.memory) < self.batch_size:
+                return 0.0
+            sample = self.memory.sample(self.batch_size)
+        else:
+            if len(batch) < self.batch_size:
+                return 0.0
+            states, actions, rewards, next_states, dones = zip(*batch)
+            sample = {
+                "states": np.asarray(states, dtype=np.float32),
+                "actions": np.asarray(actions, dtype=np.int64),
+                "rewards": np.asarray(rewards, dtype=np.float32),
+                "next_states": np.asarray(next_states, dtype=np.float32),
+                "dones": np.asarray(dones, dtype=np.float32)
+            }
+        
+        # Wrap arrays as tensors without copying
+        states = torch.from_numpy(sample["states"])
+        actions = torch.from_numpy(sample["actions"])
+        rewards = torch.from_numpy(sample["rewards"])
+        next_states = torch.from_numpy(sample["next_states"])
+        dones = torch.from_numpy(sample["dones"])
         
         # Compute current Q values
-        current_q_values = self.model(states).gather(1, actions.unsqueeze(1))
+        current_q_values = self.model(states).gather(1, actions.unsqueeze(1)).squeeze(1)
         
         # Compute next Q values
         with torch.no_grad():
             next_q_values = self.target_model(next_states).max(1)[0]
             target_q_values = rewards + (1 - dones) * self.config.gamma * next_q_values
-            
-        # Compute loss and update
-        loss = self.model.loss_fn(current_q_values.squeeze(), target_q_values)
+        
+        # Compute loss, weighting by importance sampling for prioritised replay
+        if "weights" in sample and isinstance(self.memory, PrioritizedReplayBuffer):
+            td_errors = current_q_values - target_q_values
+            weights = torch.from_numpy(sample["weights"])
+            loss = (weights * td_errors.pow(2)).mean()
+            self.memory.update_priorities(
+                sample["indices"], td_errors.detach().abs().numpy()
+            )
+        else:
+            loss = self.model.loss_fn(current_q_values, target_q_values)
+        
         self.model.optimizer.zero_grad()
         loss.backward()
         self.model.optimizer.step()
@@ -118,8 +183,26 @@ class DynamicPricingAgent:
         
         return float(new_price)
     
+    def optimize_prices(self, states: np.ndarray, base_prices: np.ndarray,
+                        epsilon: float = 0.1) -> np.ndarray:
+        """Optimize prices for many products from their current states."""
+        base_prices = np.asarray(base_prices, dtype=np.float64)
+        new_prices = base_prices * (1 + self.select_actions(states, epsilon))
+        
+        # Ensure prices stay within 30% of the base price
+        return np.clip(new_prices, base_prices * 0.7, base_prices * 1.3)
+    
+    def train_local(self, n_rollouts: Optional[int] = None, **kwargs) -> Dict[str, float]:
+        """Train in-process from parallel simulator rollout workers."""
+        trainer = LocalPricingTrainer(self, **kwargs)
+        return trainer.train(n_rollouts or self.config.local_training_rollouts)
+    
     def train(self, training_data: List[Dict]) -> None:
         """Train the pricing model using historical data."""
+        if self.config.training_mode == 'local':
+            self.train_local()
+            return
+        
         # Create Vertex AI custom training job
         job = aiplatform.CustomTrainingJob(
             display_name=f"train_{self.config.model_name}",
@@ -0,0 +1,144 @@
+from typing import Dict, Optional, Sequence
+import numpy as np
+from datetime import datetime
+
+def pricing_reason(is_discount: bool, context: Optional[Dict]) -> str:
+    """Human-readable reason for a price below or above the original price."""
+    context = context or {}
+    if is_discount:
+        if context.get("high_inventory", False):
+            return "High inventory levels"
+        elif context.get("competitive_pressure", False):
+            return "Competitive pricing"
+        else:
+            return "Demand optimization"
+    else:
+        if context.get("low_inventory", False):
+            return "Low inventory levels"
+        elif context.get("high_demand", False):
+            return "High demand"
+        else:
+            return "Market conditions"
+
+class CompiledPricingRules:
+    """Pricing rules and product constraints compiled into columnar arrays.
+
+    Every product owns one row in each array, so constraints for any set of
+    products are applied with a gather and a few vectorised clamps. Optional
+    ``min_price``/``max_price`` bounds from pricing rules are NaN when unset.
+    """
+
+    CONSTRAINT_COLUMNS = ("cost", "min_margin", "max_discount", "original_price")
+    RULE_COLUMNS = ("min_price", "max_price")
+
+    def __init__(self, product_ids: Sequence[str], columns: Dict[str, np.ndarray]):
+        self._rows = {product_id: i for i, product_id in enumerate(product_ids)}
+        self.columns = columns
+        self.loaded_at = datetime.now()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self._rows
+
+    @classmethod
+    def from_records(
+        cls,
+        constraints: Dict[str, Dict],
+        rules: Dict[str, Dict]
+    ) -> "CompiledPricingRules":
+        """Compile per-product constraint and rule dicts into arrays."""
+        product_ids = list(constraints)
+        columns = {
+            column: np.array(
+                [constraints[pid][column] for pid in product_ids],
+                dtype=np.float64
+            )
+            for column in cls.CONSTRAINT_COLUMNS
+        }
+        for column in cls.RULE_COLUMNS:
+            columns[column] = np.array(
+                [
+                    (rules.get(pid) or {}).get(column, np.nan)
+                    for pid in product_ids
+                ],
+                dtype=np.float64
+            )
+
+        return cls(product_ids, columns)
+
+    def extend(
+        self,
+        constraints: Dict[str, Dict],
+        rules: Dict[str, Dict]
+    ) -> "CompiledPricingRules":
+        """Return a copy with rows added for products not compiled yet."""
+        constraints = {
+            product_id: record for product_id, record in constraints.items()
+            if product_id not in self._rows
+        }
+        if not constraints:
+            return self
+
+        added = self.from_records(constraints, rules)
+        extended = type(self)(
+            list(self._rows) + list(added._rows),
+            {
+                name: np.concatenate([values, added.columns[name]])
+                for name, values in self.columns.items()
+            }
+        )
+        # Age still counts from the last full load
+        extended.loaded_at = self.loaded_at
+        return extended
+
+    def missing(self, product_ids: Sequence[str]) -> list:
+        """Return product ids that have no compiled constraints."""
+        return [product_id for product_id in product_ids if product_id not in self._rows]
+
+    def apply(
+        self,
+        product_ids: Sequence[str],
+        prices: np.ndarray,
+        context: Optional[Dict] = None
+    ) -> Dict[str, np.ndarray]:
+        """Clamp prices to rules and constraints, returning per-row results."""
+        missing = self.missing(product_ids)
+        if missing:
+            raise ValueError(f"No pricing constraints for products: {missing[:10]}")
+
+        rows = np.fromiter(
+            (self._rows[product_id] for product_id in product_ids),
+            dtype=np.int64,
+            count=len(product_ids)
+        )
+        column = {name: values[rows] for name, values in self.columns.items()}
+        prices = np.asarray(prices, dtype=np.float64)
+
+        # Apply rule bounds first so constraints below always take precedence
+        prices = np.fmax(prices, column["min_price"])
+        prices = np.fmin(prices, column["max_price"])
+
+        # Apply minimum margin
+        prices = np.maximum(prices, column["cost"] * (1 + column["min_margin"]))
+
+        # Apply maximum discount
+        original_prices = column["original_price"]
+        prices = np.maximum(prices, original_prices * (1 - column["max_discount"]))
+
+        return {
+            "price": prices,
+            "original_price": original_prices,
+            "discount_percentage": (original_prices - prices) / original_prices * 100,
+            "reason": self.reasons(prices < original_prices, context)
+        }
+
+    @staticmethod
+    def reasons(is_discount: np.ndarray, context: Optional[Dict]) -> np.ndarray:
+        """Reason string per row; context is shared, so there are two choices."""
+        return np.where(
+            is_discount,
+            pricing_reason(True, context),
+            pricing_reason(False, context)
+        )
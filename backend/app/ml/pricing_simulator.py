@@ -0,0 +1,240 @@
+from typing import Dict, Optional, Tuple
+import time
+import numpy as np
+
+class MarketSimulator:
+    """Synthetic market for exercising pricing policies offline.
+
+    Every product has its own constant-elasticity demand curve, a competitor
+    price following a mean-reverting random walk, weekly seasonality and an
+    inventory that is replenished when it runs low. All products are stepped
+    together with array operations, so thousands of products cost about the
+    same as one.
+    """
+
+    def __init__(
+        self,
+        n_products: int,
+        state_dim: int,
+        episode_length: int = 90,
+        seed: Optional[int] = 0
+    ):
+        self.n_products = n_products
+        self.state_dim = state_dim
+        self.episode_length = episode_length
+        self.rng = np.random.default_rng(seed)
+
+        n = n_products
+        self.base_prices = self.rng.lognormal(mean=3.0, sigma=0.8, size=n)
+        self.costs = self.base_prices * self.rng.uniform(0.4, 0.7, size=n)
+        self.elasticity = self.rng.uniform(-3.0, -0.5, size=n)
+        self.competition_sensitivity = self.rng.uniform(0.5, 2.0, size=n)
+        self.base_demand = self.rng.lognormal(mean=2.0, sigma=0.7, size=n)
+        self.capacity = np.ceil(self.base_demand * 14)
+
+        self.reset()
+
+    def reset(self) -> np.ndarray:
+        """Start a new episode and return the initial states."""
+        self.t = 0
+        self.prices = self.base_prices.copy()
+        self.competitor_prices = self.base_prices * self.rng.uniform(0.85, 1.15, self.n_products)
+        self.inventory = self.capacity.copy()
+        self.last_sales = self.base_demand.copy()
+        return self.observe()
+
+    def observe(self) -> np.ndarray:
+        """Build ``(n_products, state_dim)`` state features."""
+        day = 2 * np.pi * (self.t % 7) / 7
+        features = np.column_stack([
+            self.prices / self.base_prices,
+            self.competitor_prices / self.base_prices,
+            self.inventory / self.capacity,
+            self.last_sales / self.base_demand,
+            self.costs / self.base_prices,
+            self.elasticity,
+            np.full(self.n_products, np.sin(day)),
+            np.full(self.n_products, np.cos(day)),
+            np.full(self.n_products, self.t / self.episode_length)
+        ]).astype(np.float32)
+
+        # Pad or truncate to the agent's state size
+        states = np.zeros((self.n_products, self.state_dim), dtype=np.float32)
+        width = min(self.state_dim, features.shape[1])
+        states[:, :width] = features[:, :width]
+        return states
+
+    def step(
+        self,
+        adjustments: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, float]]:
+        """Apply relative price adjustments and advance the market one day."""
+        self.prices = np.clip(
+            self.base_prices * (1 + np.asarray(adjustments, dtype=np.float64)),
+            self.base_prices * 0.7,
+            self.base_prices * 1.3
+        )
+
+        # Expected demand from own price, competitor gap and seasonality
+        seasonality = 1 + 0.2 * np.sin(2 * np.pi * (self.t % 7) / 7)
+        expected_demand = (
+            self.base_demand
+            * (self.prices / self.base_prices) ** self.elasticity
+            * (self.prices / self.competitor_prices) ** -self.competition_sensitivity
+            * seasonality
+        )
+        sales = np.minimum(self.rng.poisson(expected_demand), self.inventory)
+
+        revenue = self.prices * sales
+        profit = (self.prices - self.costs) * sales
+        rewards = (profit / self.base_prices).astype(np.float32)
+
+        # Inventory replenishes to capacity once it falls below a quarter
+        self.inventory = self.inventory - sales
+        restock = self.inventory < 0.25 * self.capacity
+        self.inventory[restock] = self.capacity[restock]
+        self.last_sales = sales
+
+        # Competitors drift but revert towards the base price
+        self.competitor_prices = (
+            self.competitor_prices
+            + 0.1 * (self.base_prices - self.competitor_prices)
+            + self.rng.normal(0, 0.02, self.n_products) * self.base_prices
+        )
+
+        self.t += 1
+        done = self.t >= self.episode_length
+        dones = np.full(self.n_products, float(done), dtype=np.float32)
+        next_states = self.observe()
+        if done:
+            self.reset()
+
+        info = {
+            "revenue": float(revenue.sum()),
+            "profit": float(profit.sum()),
+            "units": float(sales.sum())
+        }
+        return next_states, rewards, dones, info
+
+def run_training_benchmark(
+    agent,
+    simulator: MarketSimulator,
+    steps: int,
+    epsilon: float = 0.1,
+    updates_per_step: int = 1
+) -> Dict[str, float]:
+    """Train ``agent`` against the simulator and report throughput and revenue."""
+    states = simulator.reset()
+    revenue = profit = 0.0
+    losses = []
+    update_time = 0.0
+
+    started_at = time.perf_counter()
+    for _ in range(steps):
+        actions = agent.select_action_indices(states, epsilon)
+        next_states, rewards, dones, info = simulator.step(
+            agent.action_to_adjustment(actions)
+        )
+        agent.memory.add_batch(states, actions, rewards, next_states, dones)
+
+        update_started_at = time.perf_counter()
+        for _ in range(updates_per_step):
+            losses.append(agent.update_model())
+        update_time += time.perf_counter() - update_started_at
+
+        revenue += info["revenue"]
+        profit += info["profit"]
+        # The simulator resets itself at the end of an episode
+        states = simulator.observe() if dones[0] else next_states
+    elapsed = time.perf_counter() - started_at
+
+    return {
+        "env_steps_per_sec": steps / elapsed,
+        "decisions_per_sec": steps * simulator.n_products / elapsed,
+        "updates_per_sec": steps * updates_per_step / max(update_time, 1e-9),
+        "revenue": revenue,
+        "profit": profit,
+        "final_loss": float(losses[-1]) if losses else 0.0
+    }
+
+def run_inference_benchmark(
+    agent,
+    simulator: MarketSimulator,
+    repeats: int = 10,
+    single_samples: int = 1000
+) -> Dict[str, float]:
+    """Measure batched and single-state action selection latency."""
+    states = simulator.observe()
+
+    started_at = time.perf_counter()
+    for _ in range(repeats):
+        agent.select_action_indices(states, epsilon=0.0)
+    batched_elapsed = time.perf_counter() - started_at
+
+    single_states = states[:single_samples]
+    started_at = time.perf_counter()
+    for state in single_states:
+        agent.select_action(state, epsilon=0.0)
+    single_elapsed = time.perf_counter() - started_at
+
+    return {
+        "batched_decisions_per_sec": repeats * len(states) / batched_elapsed,
+        "batched_latency_ms": 1000 * batched_elapsed / repeats,
+        "single_decisions_per_sec": len(single_states) / single_elapsed,
+        "single_latency_us": 1e6 * single_elapsed / max(len(single_states), 1)
+    }
+
+def run_policy_evaluation(
+    agent,
+    simulator: MarketSimulator,
+    episodes: int = 1
+) -> Dict[str, float]:
+    """Run the greedy policy for whole episodes and report revenue and profit."""
+    revenue = profit = 0.0
+    for _ in range(episodes):
+        states = simulator.reset()
+        for _ in range(simulator.episode_length):
+            states, _, _, info = simulator.step(agent.select_actions(states, epsilon=0.0))
+            revenue += info["revenue"]
+            profit += info["profit"]
+
+    return {
+        "revenue_per_episode": revenue / episodes,
+        "profit_per_episode": profit / episodes
+    }
+
+def run_engine_inference_benchmark(
+    engine,
+    n_rows: int,
+    n_features: int,
+    repeats: int = 10,
+    seed: int = 0
+) -> Dict[str, float]:
+    """Time DynamicPricingEngine's in-process model calls on synthetic rows."""
+    X = np.random.default_rng(seed).normal(size=(n_rows, n_features)).astype(np.float32)
+    results = {}
+
+    models = {
+        "demand": engine.demand_fn,
+        "actor": engine.actor_fn
+    }
+    # The elasticity model can only be exported once it has been fitted
+    if hasattr(engine.elasticity_model, "estimators_"):
+        models["elasticity"] = engine._predict_elasticity
+
+    for name, model in models.items():
+        model(X[:1])
+        started_at = time.perf_counter()
+        for _ in range(repeats):
+            model(X)
+        batched = (time.perf_counter() - started_at) / repeats
+
+        started_at = time.perf_counter()
+        for _ in range(repeats):
+            model(X[:1])
+        single = (time.perf_counter() - started_at) / repeats
+
+        results[f"{name}_rows_per_sec"] = n_rows / batched
+        results[f"{name}_single_row_latency_us"] = 1e6 * single
+
+    return results
@@ -1,9 +1,13 @@
 import tensorflow as tf
 from tensorflow.keras import layers, Model
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple, Union
 import numpy as np
 from google.cloud import aiplatform
 from .config import RecommenderConfig
+from .candidates import CandidateBatch
+from .embedding_store import ProductEmbeddingStore
+from .local_inference import LocalTwoTowerEndpoint
+from .topk import StreamingTopK, top_k
 
 class ProductRecommender:
     def __init__(self, config: RecommenderConfig):
@@ -13,6 +17,10 @@ class ProductRecommender:
             project=config.vertex_ai_project,
             location=config.vertex_ai_region
         )
+        self.catalog: Optional[CandidateBatch] = None
+        
+        if config.inference_mode == 'local':
+            self.use_local_inference()
     
     def _build_model(self) -> Model:
         """Build two-tower recommendation model architecture."""
@@ -26,7 +34,7 @@ class ProductRecommender:
         
         # Compute similarity
         dot_product = layers.Dot(axes=1)([user_embedding, product_embedding])
-        output = layers.Dense(1, activation='sigmoid')(dot_product)
+        output = layers.Dense(1, activation='sigmoid', name='score')(dot_product)
         
         model = Model(
             inputs=[user_input, product_input],
@@ -83,25 +91,92 @@ class ProductRecommender:
         self.endpoint = endpoint
     
     def generate_recommendations(self, user_features: np.ndarray, 
-                               candidate_products: List[Dict]) -> List[Dict]:
+                               candidate_products: Union[List[Dict], CandidateBatch]) -> List[Dict]:
         """Generate personalized product recommendations."""
-        # Prepare product features
-        product_features = np.array([
-            [p[feature] for feature in self.config.product_features]
-            for p in candidate_products
-        ])
-        
-        # Get predictions from deployed endpoint
-        predictions = self.endpoint.predict([user_features, product_features])
+        if isinstance(candidate_products, CandidateBatch):
+            indices, scores = self.score_candidates(user_features, candidate_products)
+            top_products = candidate_products.to_records(indices)
+        else:
+            batch = CandidateBatch.from_records(
+                candidate_products, self.config.product_features
+            )
+            indices, scores = self.score_candidates(user_features, batch)
+            top_products = [candidate_products[i] for i in indices]
         
-        # Sort products by prediction scores
-        scored_products = [
+        # Only the winners are materialised as result dicts
+        return [
             {**product, 'score': float(score)}
-            for product, score in zip(candidate_products, predictions)
+            for product, score in zip(top_products, scores)
         ]
-        scored_products.sort(key=lambda x: x['score'], reverse=True)
+    
+    def score_candidates(self, user_features: np.ndarray,
+                         candidates: CandidateBatch) -> Tuple[np.ndarray, np.ndarray]:
+        """Score a columnar candidate batch, returning top-K indices and scores."""
+        top = StreamingTopK(self.config.top_k)
+        chunk_size = self.config.scoring_chunk_size
+        
+        # Score candidates chunk by chunk, keeping only a running top-K
+        for start in range(0, len(candidates), chunk_size):
+            stop = min(start + chunk_size, len(candidates))
+            product_features = candidates.feature_matrix(
+                self.config.product_features, start, stop
+            )
+            
+            # Get predictions from deployed endpoint
+            predictions = self.endpoint.predict([user_features, product_features])
+            top.push(np.asarray(predictions), np.arange(start, stop))
+        
+        return top.result()
+    
+    def use_local_inference(self, catalog: Optional[CandidateBatch] = None) -> None:
+        """Serve predictions in-process instead of from the Vertex endpoint."""
+        if self.config.local_model_path:
+            self.endpoint = LocalTwoTowerEndpoint.from_saved_model(
+                self.config.local_model_path
+            )
+        else:
+            self.endpoint = LocalTwoTowerEndpoint(self.model)
+        
+        if catalog is not None:
+            self.index_catalog(catalog)
+    
+    def index_catalog(self, catalog: CandidateBatch) -> None:
+        """Precompute product tower embeddings for the catalog."""
+        if not isinstance(self.endpoint, LocalTwoTowerEndpoint):
+            raise ValueError("Catalog indexing requires local inference mode")
         
-        return scored_products[:10]  # Return top 10 recommendations
+        product_features = catalog.feature_matrix(self.config.product_features)
+        
+        if self.config.product_embedding_cache_path:
+            # Cached rows are tied to the current tower weights and refreshed
+            # only for products whose features changed
+            cache = ProductEmbeddingStore(
+                self.config.product_embedding_cache_path,
+                dim=self.config.embedding_dim,
+                dtype=self.config.product_embedding_cache_dtype,
+                version=f"{self.config.version}-{self.endpoint.model_fingerprint()}",
+                normalize=False
+            )
+            self.endpoint.refresh_catalog(
+                catalog.columns['id'].tolist(), product_features, cache
+            )
+        else:
+            self.endpoint.index_catalog(product_features)
+        
+        self.catalog = catalog
+    
+    def recommend_from_catalog(self, user_features: np.ndarray) -> List[Dict]:
+        """Score a user against the indexed catalog with one matrix-vector product."""
+        if self.catalog is None:
+            raise ValueError("index_catalog must be called first")
+        
+        scores = self.endpoint.score_catalog(user_features)
+        indices = top_k(scores, self.config.top_k)
+        
+        return [
+            {**product, 'score': float(score)}
+            for product, score in zip(self.catalog.to_records(indices), scores[indices])
+        ]
     
     def update_embeddings(self, user_id: str, interaction_data: Dict) -> None:
         """Update user embeddings based on new interactions."""
@@ -0,0 +1,213 @@
+from typing import Dict, Optional
+import numpy as np
+
+class ReplayBuffer:
+    """Fixed-capacity circular experience buffer backed by preallocated arrays.
+
+    Appends overwrite the oldest transition once the buffer is full, and
+    sampling is a single vectorised gather per field.
+    """
+
+    def __init__(self, capacity: int, state_dim: int, seed: Optional[int] = None):
+        self.capacity = capacity
+        self.state_dim = state_dim
+        self.rng = np.random.default_rng(seed)
+
+        self.states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(
+        self,
+        state: np.ndarray,
+        action: int,
+        reward: float,
+        next_state: np.ndarray,
+        done: bool
+    ) -> int:
+        """Append one transition in O(1) and return its slot."""
+        i = self._next
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return i
+
+    def add_batch(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        dones: np.ndarray
+    ) -> np.ndarray:
+        """Append many transitions at once and return their slots."""
+        n = len(actions)
+        slots = (self._next + np.arange(n)) % self.capacity
+
+        # With more rows than capacity only the newest ones survive
+        keep = slice(max(0, n - self.capacity), n)
+        self.states[slots[keep]] = states[keep]
+        self.actions[slots[keep]] = actions[keep]
+        self.rewards[slots[keep]] = rewards[keep]
+        self.next_states[slots[keep]] = next_states[keep]
+        self.dones[slots[keep]] = dones[keep]
+
+        self._next = int((self._next + n) % self.capacity)
+        self._size = min(self._size + n, self.capacity)
+        return slots[keep]
+
+    def sample(self, batch_size: int) -> Dict[str, np.ndarray]:
+        """Sample transitions uniformly."""
+        indices = self.rng.integers(0, self._size, size=batch_size)
+        return self._gather(indices, np.ones(batch_size, dtype=np.float32))
+
+    def _gather(self, indices: np.ndarray, weights: np.ndarray) -> Dict[str, np.ndarray]:
+        return {
+            "states": self.states[indices],
+            "actions": self.actions[indices],
+            "rewards": self.rewards[indices],
+            "next_states": self.next_states[indices],
+            "dones": self.dones[indices],
+            "indices": indices,
+            "weights": weights
+        }
+
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        return {
+            "states": self.states,
+            "actions": self.actions,
+            "rewards": self.rewards,
+            "next_states": self.next_states,
+            "dones": self.dones,
+            "cursor": np.array([self._next, self._size])
+        }
+
+    def load_state_dict(self, state: Dict[str, np.ndarray]):
+        for name in ("states", "actions", "rewards", "next_states", "dones"):
+            getattr(self, name)[:] = state[name]
+        self._next, self._size = (int(x) for x in state["cursor"])
+
+    def save(self, path: str):
+        """Persist buffer contents to a ``.npz`` file."""
+        with open(path, "wb") as f:
+            np.savez(f, **self.state_dict())
+
+    def load(self, path: str):
+        """Restore contents written by ``save`` into this buffer."""
+        with np.load(path, allow_pickle=False) as data:
+            self.load_state_dict(dict(data))
+
+class SumTree:
+    """Binary tree of priorities supporting vectorised prefix-sum lookups."""
+
+    def __init__(self, capacity: int):
+        # Round up to a power of two so leaves sit on a single level
+        self.n_leaves = 1 << max(0, int(np.ceil(np.log2(max(capacity, 1)))))
+        self.tree = np.zeros(2 * self.n_leaves, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def leaves(self, indices: np.ndarray) -> np.ndarray:
+        return self.tree[self.n_leaves + indices]
+
+    def update(self, indices: np.ndarray, priorities: np.ndarray):
+        """Set leaf priorities and refresh their ancestors level by level."""
+        nodes = self.n_leaves + np.asarray(indices)
+        self.tree[nodes] = priorities
+
+        nodes = np.unique(nodes // 2)
+        while nodes[0] >= 1:
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+            if nodes[0] == 1:
+                break
+            nodes = np.unique(nodes // 2)
+
+    def find(self, prefix_sums: np.ndarray) -> np.ndarray:
+        """Return leaf indices whose cumulative priority covers ``prefix_sums``."""
+        values = np.array(prefix_sums, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+
+        while nodes[0] < self.n_leaves:
+            left = 2 * nodes
+            go_right = values > self.tree[left]
+            values -= np.where(go_right, self.tree[left], 0.0)
+            nodes = left + go_right
+
+        return nodes - self.n_leaves
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """Replay buffer sampling transitions in proportion to their TD error."""
+
+    def __init__(
+        self,
+        capacity: int,
+        state_dim: int,
+        alpha: float = 0.6,
+        beta: float = 0.4,
+        epsilon: float = 1e-5,
+        seed: Optional[int] = None
+    ):
+        super().__init__(capacity, state_dim, seed=seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+
+    def add(self, state, action, reward, next_state, done) -> int:
+        i = super().add(state, action, reward, next_state, done)
+        # New transitions get the highest priority so they are seen at least once
+        self.tree.update(np.array([i]), np.array([self.max_priority ** self.alpha]))
+        return i
+
+    def add_batch(self, states, actions, rewards, next_states, dones) -> np.ndarray:
+        slots = super().add_batch(states, actions, rewards, next_states, dones)
+        self.tree.update(slots, np.full(len(slots), self.max_priority ** self.alpha))
+        return slots
+
+    def sample(self, batch_size: int) -> Dict[str, np.ndarray]:
+        """Stratified proportional sampling with importance-sampling weights."""
+        total = self.tree.total
+        segment = total / batch_size
+        prefix_sums = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+
+        indices = np.minimum(self.tree.find(prefix_sums), self._size - 1)
+        probabilities = self.tree.leaves(indices) / total
+
+        weights = (self._size * probabilities) ** -self.beta
+        weights = (weights / weights.max()).astype(np.float32)
+
+        return self._gather(indices, weights)
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray):
+        """Reprioritise sampled transitions by the magnitude of their TD error."""
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
+
+    def state_dict(self) -> Dict[str, np.ndarray]:
+        return {
+            **super().state_dict(),
+            "priorities": self.tree.tree,
+            "max_priority": np.array(self.max_priority)
+        }
+
+    def load_state_dict(self, state: Dict[str, np.ndarray]):
+        super().load_state_dict(state)
+        self.tree.tree[:] = state["priorities"]
+        self.max_priority = float(state["max_priority"])
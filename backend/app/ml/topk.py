@@ -0,0 +1,61 @@
+from typing import List, Optional, Tuple
+import heapq
+import numpy as np
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return indices of the ``k`` highest scores, best first.
+
+    Uses ``np.argpartition`` so only the selected ``k`` entries are sorted.
+    """
+    scores = np.ascontiguousarray(scores, dtype=np.float32).ravel()
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+class StreamingTopK:
+    """Running top-K over scores that arrive in chunks.
+
+    Each chunk is reduced to its own top ``k`` with ``top_k`` before being
+    merged into a bounded min-heap, so memory stays O(k) regardless of the
+    total number of candidates.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int]] = []
+        self._seen = 0
+
+    def push(self, scores: np.ndarray, indices: Optional[np.ndarray] = None):
+        """Add a chunk of scores.
+
+        ``indices`` are the global candidate indices of the chunk; by default
+        chunks are numbered consecutively in the order they are pushed.
+        """
+        scores = np.ascontiguousarray(scores, dtype=np.float32).ravel()
+        if indices is None:
+            indices = np.arange(self._seen, self._seen + len(scores))
+        self._seen += len(scores)
+
+        for i in top_k(scores, self.k):
+            item = (float(scores[i]), int(indices[i]))
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, item)
+            elif item[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+            else:
+                # Chunk results are sorted, so nothing later can qualify
+                break
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return global indices and scores of the top ``k``, best first."""
+        best = sorted(self._heap, key=lambda item: (-item[0], item[1]))
+        indices = np.array([index for _, index in best], dtype=np.int64)
+        scores = np.array([score for score, _ in best], dtype=np.float32)
+        return indices, scores
@@ -0,0 +1,99 @@
+import numpy as np
+from sklearn.dummy import DummyRegressor
+from sklearn.ensemble import GradientBoostingRegressor
+
+class FlatTreeEnsemble:
+    """Array-based evaluator exported from a fitted GradientBoostingRegressor.
+
+    Each tree's nodes are stored in padded ``(n_trees, max_nodes)`` arrays.
+    Leaves point to themselves, so every row walks all trees in lock-step for
+    exactly ``depth`` steps using vectorised gathers, with no per-row Python
+    work and none of sklearn's per-call input validation.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        init: float,
+        learning_rate: float,
+        depth: int
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.init = init
+        self.learning_rate = learning_rate
+        self.depth = depth
+        self._trees = np.arange(len(feature))
+
+    @classmethod
+    def from_sklearn(cls, model: GradientBoostingRegressor) -> "FlatTreeEnsemble":
+        """Export a fitted single-output regressor with a constant init."""
+        if not hasattr(model, "estimators_"):
+            raise ValueError("GradientBoostingRegressor must be fitted before export")
+
+        if isinstance(model.init_, str) and model.init_ == "zero":
+            init = 0.0
+        elif isinstance(model.init_, DummyRegressor):
+            init = float(np.ravel(model.init_.constant_)[0])
+        else:
+            raise ValueError("Only constant init estimators can be exported")
+
+        trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+        max_nodes = max(tree.node_count for tree in trees)
+        shape = (len(trees), max_nodes)
+
+        feature = np.zeros(shape, dtype=np.int64)
+        threshold = np.zeros(shape, dtype=np.float64)
+        left = np.zeros(shape, dtype=np.int64)
+        right = np.zeros(shape, dtype=np.int64)
+        value = np.zeros(shape, dtype=np.float64)
+
+        for t, tree in enumerate(trees):
+            n = tree.node_count
+            nodes = np.arange(n)
+            is_leaf = tree.children_left == -1
+
+            feature[t, :n] = np.where(is_leaf, 0, tree.feature)
+            threshold[t, :n] = tree.threshold
+            left[t, :n] = np.where(is_leaf, nodes, tree.children_left)
+            right[t, :n] = np.where(is_leaf, nodes, tree.children_right)
+            value[t, :n] = tree.value[:, 0, 0]
+
+        return cls(
+            feature,
+            threshold,
+            left,
+            right,
+            value,
+            init=init,
+            learning_rate=model.learning_rate,
+            depth=max(tree.max_depth for tree in trees)
+        )
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict for a 2-D batch of rows."""
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.zeros((len(X), len(self._trees)), dtype=np.int64)
+
+        for _ in range(self.depth):
+            go_left = (
+                X[rows, self.feature[self._trees, nodes]]
+                <= self.threshold[self._trees, nodes]
+            )
+            nodes = np.where(
+                go_left,
+                self.left[self._trees, nodes],
+                self.right[self._trees, nodes]
+            )
+
+        leaf_values = self.value[self._trees, nodes].sum(axis=1)
+        return self.init + self.learning_rate * leaf_values
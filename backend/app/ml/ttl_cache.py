@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import asyncio
+import time
+
+class TTLCache:
+    """In-process LRU cache whose entries expire after ``ttl_seconds``.
+
+    ``get_or_fetch`` runs one fetch per key no matter how many callers miss
+    at once, and caches ``None`` results like any other value.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 100_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value, or ``default`` if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def set(self, key: Hashable, value: Any):
+        """Cache ``value`` under ``key``, evicting the least recently used entry."""
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable]) -> Any:
+        """Return the cached value, sharing a single in-flight fetch on a miss."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish_fetch(key, done))
+
+        # A cancelled caller must not cancel the fetch other callers share
+        return await asyncio.shield(task)
+
+    def _finish_fetch(self, key: Hashable, task: asyncio.Future):
+        # An invalidation during the fetch detaches it, so its result is dropped
+        if self._inflight.get(key) is not task:
+            return
+        del self._inflight[key]
+        if not task.cancelled() and task.exception() is None:
+            self.set(key, task.result())
+
+    def invalidate(self, key: Hashable):
+        """Drop ``key`` if present."""
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._inflight.clear()
+
+_MISSING = object()
@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from app.ml.aggregate_state import DailyAggregateState
+
+
+def test_window_days_marks_only_whole_settled_days_storable(tmp_path):
+    state = DailyAggregateState(str(tmp_path), "counts", lag=timedelta(hours=6))
+
+    window = state.window_days(datetime(2024, 1, 1, 12), datetime(2024, 1, 4))
+
+    assert window == {
+        "2024-01-01": False,
+        "2024-01-02": True,
+        "2024-01-03": True,
+        "2024-01-04": False
+    }
+
+    now = datetime.utcnow()
+    today = datetime(now.year, now.month, now.day)
+    recent = state.window_days(today - timedelta(days=1), today)
+    # Yesterday only settles once the lag has passed
+    assert recent[(today - timedelta(days=1)).strftime("%Y-%m-%d")] == (
+        today + state.lag <= now
+    )
+
+
+def test_window_days_converts_aware_bounds_to_utc(tmp_path):
+    state = DailyAggregateState(str(tmp_path), "counts")
+    plus_two = timezone(timedelta(hours=2))
+
+    window = state.window_days(
+        datetime(2024, 1, 2, 1, tzinfo=plus_two),
+        datetime(2024, 1, 3, 23, 59, tzinfo=timezone.utc)
+    )
+
+    # 01:00+02:00 is 23:00 UTC on the previous day
+    assert list(window) == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert window["2024-01-02"] and not window["2024-01-01"]
+
+
+def test_fold_sums_counts_and_keeps_latest_timestamp(tmp_path):
+    state = DailyAggregateState(str(tmp_path), "counts")
+    state.write_day("2024-01-01", pd.DataFrame({
+        "user_id": ["a", "b"],
+        "product_id": ["x", "x"],
+        "interaction_count": [2, 1],
+        "last_seen": pd.to_datetime(["2024-01-01 10:00", "2024-01-01 11:00"])
+    }))
+    state.write_day("2024-01-02", pd.DataFrame({
+        "user_id": ["a"],
+        "product_id": ["x"],
+        "interaction_count": [3],
+        "last_seen": pd.to_datetime(["2024-01-02 09:00"])
+    }))
+
+    folded = state.fold(
+        state.read_days(state.days()),
+        keys=["user_id", "product_id"],
+        sums=["interaction_count"],
+        maxes=["last_seen"]
+    ).set_index("user_id")
+
+    assert state.days() == ["2024-01-01", "2024-01-02"]
+    assert folded.loc["a", "interaction_count"] == 5
+    assert folded.loc["a", "last_seen"] == pd.Timestamp("2024-01-02 09:00")
+    assert folded.loc["b", "interaction_count"] == 1
+    assert state.fold(pd.DataFrame(), keys=["user_id"], sums=["n"]).empty
+
+
+def test_interaction_counts_accept_aware_dates_and_reuse_stored_days(tmp_path):
+    pytest.importorskip("sklearn")
+    pytest.importorskip("google.cloud.bigquery")
+    from app.ml.feature_engineering import FeatureEngineeringPipeline
+
+    pipeline = FeatureEngineeringPipeline.__new__(FeatureEngineeringPipeline)
+    pipeline.aggregate_state = DailyAggregateState(str(tmp_path), "counts", lag=timedelta(0))
+    queried = []
+
+    async def query_partials(start_date, end_date):
+        queried.append((start_date, end_date))
+        days = pd.date_range(start_date.date(), end_date.date(), freq="D")
+        return pd.DataFrame({
+            "user_id": "a",
+            "product_id": "x",
+            "day": days.strftime("%Y-%m-%d"),
+            "interaction_count": 1,
+            "last_seen": days
+        })
+
+    pipeline._query_interaction_partials = query_partials
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 1, 3, 12, tzinfo=timezone.utc)
+
+    first = asyncio.run(pipeline._get_interaction_counts(start, end))
+    second = asyncio.run(pipeline._get_interaction_counts(start, end))
+
+    assert first["interaction_count"].tolist() == [3]
+    assert second["interaction_count"].tolist() == [3]
+    assert queried[0] == (datetime(2024, 1, 1), datetime(2024, 1, 3, 12))
+    # Only the partial last day is queried again
+    assert queried[1] == (datetime(2024, 1, 3), datetime(2024, 1, 3, 12))
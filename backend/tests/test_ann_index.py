@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from app.ml.ann_index import IVFIndex
+
+
+def _catalog(n: int = 500, dim: int = 16, seed: int = 0):
+    vectors = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    ids = [f"p{i}" for i in range(n)]
+    return ids, vectors
+
+
+def _brute_force(ids, vectors, query, k):
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normed @ (query / np.linalg.norm(query))
+    top = np.argsort(-scores)[:k]
+    return [ids[i] for i in top], scores[top]
+
+
+def test_search_probing_every_list_matches_brute_force():
+    ids, vectors = _catalog()
+    index = IVFIndex.build(ids, vectors, n_lists=8)
+    query = np.random.default_rng(1).normal(size=16)
+
+    found, scores = index.search(query, k=10, n_probe=index.n_lists)
+    expected, expected_scores = _brute_force(ids, vectors, query, 10)
+
+    assert list(found) == expected
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5, atol=1e-6)
+
+
+def test_search_scores_are_sorted_and_bounded_by_k():
+    ids, vectors = _catalog()
+    index = IVFIndex.build(ids, vectors, n_lists=8, n_probe=2)
+
+    found, scores = index.search(vectors[0], k=5)
+
+    assert len(found) == 5
+    assert np.all(np.diff(scores) <= 0)
+    # A stored vector is its own nearest neighbour when its list is probed
+    assert found[0] == "p0"
+
+
+def test_add_keeps_lists_grouped():
+    ids, vectors = _catalog(200)
+    index = IVFIndex.build(ids[:100], vectors[:100], n_lists=4)
+    index.add(ids[100:], vectors[100:])
+
+    assert len(index) == 200
+    assert index.list_offsets[-1] == 200
+    assignments = np.argmax(index.vectors @ index.centroids.T, axis=1)
+    assert np.all(np.diff(assignments) >= 0)
+
+
+def test_untrained_index_rejects_add_and_returns_nothing():
+    index = IVFIndex(dim=4)
+
+    found, scores = index.search(np.ones(4), k=3)
+
+    assert len(found) == 0 and len(scores) == 0
+    with pytest.raises(ValueError):
+        index.add(["a"], np.ones((1, 4)))
+
+
+def test_save_and_load_round_trip(tmp_path):
+    ids, vectors = _catalog()
+    index = IVFIndex.build(ids, vectors, n_lists=8, n_probe=3)
+    path = str(tmp_path / "index.npz")
+
+    index.save(path)
+    loaded = IVFIndex.load(path)
+
+    assert loaded.n_probe == 3
+    assert loaded.n_lists == index.n_lists
+    query = vectors[7]
+    np.testing.assert_array_equal(loaded.search(query, 5)[0], index.search(query, 5)[0])
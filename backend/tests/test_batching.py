@@ -0,0 +1,114 @@
+import asyncio
+
+import numpy as np
+
+from app.ml.batching import MicroBatcher
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_calls_share_one_batch_and_get_their_own_rows():
+    calls = []
+
+    def predict(inputs):
+        calls.append(len(inputs[0]))
+        return inputs[0].sum(axis=1, keepdims=True)
+
+    async def main():
+        batcher = MicroBatcher(predict, name="test", max_wait_ms=50)
+        results = await asyncio.gather(
+            batcher.predict(np.ones((2, 3))),
+            batcher.predict(np.full((1, 3), 2.0))
+        )
+        await batcher.close()
+        return results
+
+    first, second = _run(main())
+
+    assert calls == [3]
+    np.testing.assert_array_equal(first, [[3.0], [3.0]])
+    np.testing.assert_array_equal(second, [[6.0]])
+
+
+def test_predict_fn_error_fails_every_caller_in_the_batch():
+    def predict(inputs):
+        raise RuntimeError("model down")
+
+    async def main():
+        batcher = MicroBatcher(predict, name="test", max_wait_ms=50)
+        results = await asyncio.gather(
+            batcher.predict(np.ones((1, 2))),
+            batcher.predict(np.ones((1, 2))),
+            return_exceptions=True
+        )
+        await batcher.close()
+        return results
+
+    results = _run(main())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_mismatched_widths_fail_the_batch_and_keep_the_worker_alive():
+    async def main():
+        batcher = MicroBatcher(lambda inputs: inputs[0], name="test", max_wait_ms=50)
+        results = await asyncio.wait_for(asyncio.gather(
+            batcher.predict(np.ones((1, 2))),
+            batcher.predict(np.ones((1, 3))),
+            return_exceptions=True
+        ), timeout=5)
+        worker = batcher._worker
+
+        # The same worker serves the next request
+        follow_up = await asyncio.wait_for(batcher.predict(np.ones((1, 2))), timeout=5)
+        assert batcher._worker is worker
+        await batcher.close()
+        return results, follow_up
+
+    results, follow_up = _run(main())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    np.testing.assert_array_equal(follow_up, np.ones((1, 2)))
+
+
+def test_monitoring_failure_does_not_strand_callers():
+    class BrokenMonitoring:
+        async def log_metrics(self, metrics):
+            raise ConnectionError("metrics backend down")
+
+    async def main():
+        batcher = MicroBatcher(
+            lambda inputs: inputs[0],
+            name="test",
+            max_wait_ms=1,
+            monitoring=BrokenMonitoring()
+        )
+        first = await asyncio.wait_for(batcher.predict(np.ones((1, 2))), timeout=5)
+        second = await asyncio.wait_for(batcher.predict(np.zeros((1, 2))), timeout=5)
+        await batcher.close()
+        return first, second
+
+    first, second = _run(main())
+
+    np.testing.assert_array_equal(first, np.ones((1, 2)))
+    np.testing.assert_array_equal(second, np.zeros((1, 2)))
+
+
+def test_batches_are_capped_at_max_batch_size():
+    sizes = []
+
+    def predict(inputs):
+        sizes.append(len(inputs[0]))
+        return inputs[0]
+
+    async def main():
+        batcher = MicroBatcher(predict, name="test", max_batch_size=2, max_wait_ms=50)
+        await asyncio.gather(*(batcher.predict(np.ones((1, 1))) for _ in range(5)))
+        await batcher.close()
+
+    _run(main())
+
+    assert sum(sizes) == 5
+    assert max(sizes) <= 2
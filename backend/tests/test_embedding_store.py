@@ -0,0 +1,67 @@
+import numpy as np
+
+from app.ml.embedding_store import ProductEmbeddingStore
+
+
+def _vectors(n: int, dim: int = 8, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_gather_returns_normalised_rows_and_found_mask(tmp_path):
+    store = ProductEmbeddingStore(str(tmp_path), dim=8)
+    vectors = _vectors(2)
+    store.upsert(["a", "b"], ["ha", "hb"], vectors)
+
+    embeddings, found = store.gather(["b", "missing", "a"])
+
+    assert found.tolist() == [True, False, True]
+    assert np.all(embeddings[1] == 0)
+    expected = vectors[1] / np.linalg.norm(vectors[1])
+    np.testing.assert_allclose(embeddings[0], expected, atol=1e-3)
+    np.testing.assert_allclose(np.linalg.norm(embeddings[[0, 2]], axis=1), 1.0, atol=1e-3)
+
+
+def test_upsert_reuses_rows_and_stale_tracks_hashes(tmp_path):
+    store = ProductEmbeddingStore(str(tmp_path), dim=8)
+    store.upsert(["a", "b"], ["ha", "hb"], _vectors(2))
+    store.upsert(["a"], ["ha2"], _vectors(1, seed=1))
+
+    assert len(store) == 2
+    assert store.stale({"a": "ha2", "b": "hb", "c": "hc"}) == ["c"]
+    assert store.stale({"a": "ha"}) == ["a"]
+
+
+def test_store_grows_past_initial_capacity(tmp_path):
+    store = ProductEmbeddingStore(str(tmp_path), dim=8, initial_capacity=2)
+    ids = [f"p{i}" for i in range(5)]
+    store.upsert(ids, ids, _vectors(5))
+
+    product_ids, embeddings = store.items()
+
+    assert product_ids == ids
+    assert embeddings.shape == (5, 8)
+    assert store.gather(ids)[1].all()
+
+
+def test_flush_and_reopen_round_trip(tmp_path):
+    store = ProductEmbeddingStore(str(tmp_path), dim=8, version="v1")
+    store.upsert(["a", "b"], ["ha", "hb"], _vectors(2))
+    store.flush()
+    expected, _ = store.gather(["a", "b"])
+
+    reopened = ProductEmbeddingStore(str(tmp_path), dim=8, version="v1")
+    actual, found = reopened.gather(["a", "b"])
+
+    assert found.all()
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_version_change_invalidates_every_row(tmp_path):
+    store = ProductEmbeddingStore(str(tmp_path), dim=8, version="v1")
+    store.upsert(["a"], ["ha"], _vectors(1))
+    store.flush()
+
+    reopened = ProductEmbeddingStore(str(tmp_path), dim=8, version="v2")
+
+    assert len(reopened) == 0
+    assert reopened.stale({"a": "ha"}) == ["a"]
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from app.ml.feature_store import EVENT_TIMESTAMP, LocalFeatureStore, point_in_time_join
+
+
+def test_each_event_sees_the_snapshot_in_effect_when_it_happened():
+    features = pd.DataFrame({
+        "user_id": ["a", "a", "b"],
+        "total_orders": [1, 5, 7],
+        EVENT_TIMESTAMP: pd.to_datetime(
+            ["2024-01-01", "2024-01-10", "2024-01-05"], utc=True
+        )
+    })
+    events = pd.DataFrame({"user_id": ["a", "b", "a", "a"]})
+    # Naive event times are compared as UTC against tz-aware snapshots
+    times = pd.to_datetime(["2024-01-11", "2024-01-06", "2024-01-02", "2023-12-31"])
+
+    joined = point_in_time_join(events, features, "user_id", times)
+
+    assert joined["user_id"].tolist() == ["a", "b", "a", "a"]
+    assert joined["total_orders"].tolist()[:3] == [5, 7, 1]
+    assert np.isnan(joined["total_orders"].iloc[3])
+
+    backfilled = point_in_time_join(events, features, "user_id", times, backfill=True)
+    assert backfilled["total_orders"].tolist() == [5, 7, 1, 1]
+
+
+def test_historical_events_are_not_nan_against_a_fresh_store(tmp_path):
+    store = LocalFeatureStore(str(tmp_path))
+    # A first run materialises snapshots stamped now
+    store.write("users", pd.DataFrame({
+        "user_id": ["a", "b"],
+        "total_orders": [3, 4],
+        EVENT_TIMESTAMP: pd.Timestamp.now(tz="UTC")
+    }), "user_id")
+    events = pd.DataFrame({"user_id": ["b", "a", "c"]})
+    times = pd.Series(pd.to_datetime(["2023-03-01", "2023-02-01", "2023-01-01"], utc=True))
+
+    joined = store.join(events, "users", times, backfill=True)
+
+    assert joined["total_orders"].tolist()[:2] == [4, 3]
+    # Unknown entities still have nothing to join
+    assert np.isnan(joined["total_orders"].iloc[2])
+
+
+def test_store_normalises_naive_and_aware_timestamps(tmp_path):
+    store = LocalFeatureStore(str(tmp_path))
+    store.write("users", pd.DataFrame({
+        "user_id": ["a"],
+        "total_orders": [1],
+        EVENT_TIMESTAMP: pd.to_datetime(["2024-01-01 12:00"])
+    }), "user_id")
+    store.write("users", pd.DataFrame({
+        "user_id": ["a"],
+        "total_orders": [2],
+        EVENT_TIMESTAMP: pd.to_datetime(["2024-01-02 12:00"], utc=True)
+    }), "user_id")
+
+    rows = store.read("users", ["a"], start_time=pd.Timestamp("2024-01-02"))
+    joined = store.join(
+        pd.DataFrame({"user_id": ["a", "a"]}),
+        "users",
+        pd.to_datetime(["2024-01-01 13:00", "2024-01-03"])
+    )
+
+    assert rows["total_orders"].tolist() == [2]
+    assert str(rows[EVENT_TIMESTAMP].dt.tz) == "UTC"
+    assert joined["total_orders"].tolist() == [1, 2]
+    assert store.get_online_features("users", ["a"])["a"]["total_orders"] == 2
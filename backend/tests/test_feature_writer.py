@@ -0,0 +1,83 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+pytest.importorskip("google.cloud.bigquery")
+
+from app.ml.feature_writer import FeatureSetWriter
+
+
+def _read(tmp_path, table_id: str) -> pa.Table:
+    return pq.read_table(str(tmp_path / f"{table_id}.parquet"))
+
+
+def test_chunks_are_cast_to_the_schema_of_the_first_chunk(tmp_path):
+    writer = FeatureSetWriter(local_path=str(tmp_path), chunk_rows=2)
+    out = writer.open("features")
+    out.append(pd.DataFrame({
+        "orders": [1, 2, 3],
+        "rating": [None, None, None],
+        "flag": [True, False, True]
+    }))
+    out.append(pd.DataFrame({
+        "orders": [4.0, np.nan],
+        "rating": [4.5, np.nan],
+        "flag": [False, True]
+    }))
+    stats = out.close()
+
+    table = _read(tmp_path, "features")
+
+    assert stats["rows"] == 5
+    assert table.schema.field("orders").type == pa.int64()
+    assert table.schema.field("rating").type == pa.float64()
+    assert table.column("orders").to_pylist() == [1, 2, 3, 4, None]
+    assert table.column("rating").to_pylist() == [None, None, None, 4.5, None]
+    assert table.column("flag").to_pylist() == [True, False, True, False, True]
+
+
+def test_sparse_features_declared_at_open_may_start_in_a_later_chunk(tmp_path):
+    writer = FeatureSetWriter(local_path=str(tmp_path))
+    out = writer.open("features", sparse_columns=["t0", "t1", "t2"])
+    out.append(pd.DataFrame({"x": [1.0, 2.0]}))
+    out.append(
+        pd.DataFrame({"x": [3.0, 4.0]}),
+        sparse.csr_matrix(np.array([[0, 0.5, 0], [0.25, 0, 1.0]], dtype=np.float32)),
+        ["t0", "t1", "t2"]
+    )
+    out.close()
+
+    table = _read(tmp_path, "features")
+
+    assert out.columns == ["x", "t0", "t1", "t2"]
+    assert table.column(FeatureSetWriter.SPARSE_INDICES).to_pylist() == [[], [], [1], [0, 2]]
+    assert table.column(FeatureSetWriter.SPARSE_VALUES).to_pylist() == [[], [], [0.5], [0.25, 1.0]]
+    assert json.loads(table.schema.metadata[b"sparse_feature_columns"]) == ["t0", "t1", "t2"]
+
+
+def test_undeclared_sparse_features_after_the_first_chunk_are_rejected(tmp_path):
+    writer = FeatureSetWriter(local_path=str(tmp_path))
+    out = writer.open("features")
+    out.append(pd.DataFrame({"x": [1.0]}))
+
+    with pytest.raises(ValueError):
+        out.append(pd.DataFrame({"x": [2.0]}), sparse.csr_matrix((1, 2)), ["t0", "t1"])
+    out.abort()
+
+    assert not (tmp_path / "features.parquet").exists()
+
+
+def test_mismatched_columns_fail_clearly(tmp_path):
+    writer = FeatureSetWriter(local_path=str(tmp_path))
+    out = writer.open("features", schema=pa.schema([("x", pa.int64())]))
+
+    with pytest.raises(ValueError):
+        out.append(pd.DataFrame({"x": [1], "y": [2]}))
+    with pytest.raises(ValueError):
+        out.append(pd.DataFrame({"x": [1.5]}))
+    out.abort()
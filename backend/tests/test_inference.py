@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+from app.ml.inference import CompiledModel, DenseForward
+
+
+def _demand_model(n_features: int) -> tf.keras.Model:
+    """Same architecture as DynamicPricingEngine._build_demand_model."""
+    model = tf.keras.Sequential([
+        tf.keras.layers.Dense(128, activation='relu'),
+        tf.keras.layers.Dropout(0.3),
+        tf.keras.layers.Dense(64, activation='relu'),
+        tf.keras.layers.Dropout(0.3),
+        tf.keras.layers.Dense(32, activation='relu'),
+        tf.keras.layers.Dense(1, activation='linear')
+    ])
+    model.build((None, n_features))
+    return model
+
+
+def _actor_model(n_features: int) -> tf.keras.Model:
+    """Same architecture as the actor in DynamicPricingEngine._build_price_optimizer."""
+    model = tf.keras.Sequential([
+        tf.keras.layers.Dense(64, activation='relu'),
+        tf.keras.layers.Dense(32, activation='relu'),
+        tf.keras.layers.Dense(1, activation='sigmoid')
+    ])
+    model.build((None, n_features))
+    return model
+
+
+@pytest.mark.parametrize("build_model", [_demand_model, _actor_model])
+@pytest.mark.parametrize("n_rows", [1, 257])
+def test_dense_forward_matches_keras(build_model, n_rows):
+    tf.random.set_seed(0)
+    model = build_model(24)
+    X = np.random.default_rng(0).normal(size=(n_rows, 24)).astype(np.float32)
+
+    expected = model.predict(X, verbose=0)
+    actual = DenseForward.from_keras(model)(X)
+
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-5)
+
+
+def test_compiled_model_builds_unbuilt_model():
+    model = tf.keras.Sequential([
+        tf.keras.layers.Dense(8, activation='relu'),
+        tf.keras.layers.Dense(1, activation='linear')
+    ])
+    X = np.ones((1, 5), dtype=np.float32)
+
+    actual = CompiledModel(model)(X)
+
+    np.testing.assert_allclose(actual, model.predict(X, verbose=0), rtol=1e-5, atol=1e-5)
+
+
+def test_compiled_model_refresh_follows_new_weights():
+    model = _actor_model(6)
+    compiled = CompiledModel(model)
+    X = np.random.default_rng(1).normal(size=(4, 6)).astype(np.float32)
+    compiled(X)
+
+    model.set_weights([w + 0.5 for w in model.get_weights()])
+    compiled.refresh()
+
+    np.testing.assert_allclose(compiled(X), model.predict(X, verbose=0), rtol=1e-5, atol=1e-5)
+
+
+def test_compiled_model_refresh_before_build_defers_export():
+    model = tf.keras.Sequential([
+        tf.keras.layers.Dense(4, activation='relu'),
+        tf.keras.layers.Dense(1)
+    ])
+    compiled = CompiledModel(model)
+    compiled.refresh()
+    X = np.ones((2, 3), dtype=np.float32)
+
+    np.testing.assert_allclose(compiled(X), model.predict(X, verbose=0), rtol=1e-5, atol=1e-5)
+
+
+def test_dense_forward_rejects_unsupported_layers():
+    model = tf.keras.Sequential([
+        tf.keras.layers.Dense(4),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dense(1)
+    ])
+    model.build((None, 3))
+
+    with pytest.raises(ValueError):
+        DenseForward.from_keras(model)
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("google.cloud.aiplatform")
+
+from app.ml.config import PricingConfig
+from app.ml.local_trainer import (
+    LocalPricingTrainer,
+    SharedArrays,
+    transition_specs,
+    weight_specs
+)
+from app.ml.pricing import DQNPricingModel
+from app.ml.replay_buffer import ReplayBuffer
+
+
+def _config() -> PricingConfig:
+    return PricingConfig(
+        model_name="dynamic_pricing",
+        version="test",
+        framework="pytorch",
+        artifact_uri="",
+        state_dim=9,
+        action_dim=5,
+        hidden_dim=8
+    )
+
+
+class StubAgent:
+    """Just the parts of DynamicPricingAgent the trainer touches."""
+
+    def __init__(self, config: PricingConfig):
+        self.config = config
+        self.model = DQNPricingModel(config)
+        self.memory = ReplayBuffer(1000, config.state_dim)
+        self.updates = 0
+
+    def update_model(self) -> float:
+        self.updates += 1
+        return 0.5
+
+
+def test_shared_arrays_are_visible_through_a_second_mapping():
+    owner = SharedArrays(transition_specs(4, 3))
+    try:
+        attached = SharedArrays(owner.specs, owner.name)
+        owner.arrays["states"][:] = 1.5
+        owner.arrays["actions"][:] = [0, 1, 2, 3]
+
+        np.testing.assert_array_equal(attached.arrays["states"], np.full((4, 3), 1.5))
+        assert attached.arrays["actions"].tolist() == [0, 1, 2, 3]
+        assert attached.arrays["next_states"].shape == (4, 3)
+        attached.close()
+    finally:
+        owner.close()
+        owner.unlink()
+
+
+def test_published_weights_match_the_learner():
+    trainer = LocalPricingTrainer(StubAgent(_config()), n_workers=1)
+    weights = SharedArrays(weight_specs(trainer.agent.model))
+
+    class Lock:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+    class Version:
+        value = 0
+
+    version = Version()
+    try:
+        trainer._publish_weights(weights, Lock(), version)
+
+        assert version.value == 1
+        for name, tensor in trainer.agent.model.state_dict().items():
+            np.testing.assert_array_equal(weights.arrays[name], tensor.numpy())
+    finally:
+        weights.close()
+        weights.unlink()
+
+
+def test_train_learns_from_every_rollout():
+    agent = StubAgent(_config())
+    trainer = LocalPricingTrainer(
+        agent,
+        n_workers=2,
+        n_products=4,
+        rollout_steps=3,
+        updates_per_rollout=2
+    )
+
+    stats = trainer.train(5)
+
+    assert stats["rollouts"] == 5
+    assert stats["transitions"] == 5 * 4 * 3
+    assert len(agent.memory) == 60
+    assert agent.updates == 10
+    assert stats["final_loss"] == 0.5
+    assert np.all((agent.memory.actions[:60] >= 0) & (agent.memory.actions[:60] < 5))
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import os
+
+from app.ml.log_sink import BatchedLogSink
+
+
+class FlakyDestination:
+    """write_fn that is down until ``up`` is set and always rejects ``bad`` rows."""
+
+    def __init__(self):
+        self.up = True
+        self.rows = []
+        self.calls = 0
+
+    def __call__(self, rows):
+        self.calls += 1
+        if not self.up:
+            return ["unavailable"]
+        if any(row.get("bad") for row in rows):
+            return ["invalid row"]
+        self.rows.extend(rows)
+        return []
+
+
+def _sink(tmp_path, destination, **kwargs):
+    return BatchedLogSink(
+        destination,
+        name="test",
+        spool_path=str(tmp_path / "spool.jsonl"),
+        **kwargs
+    )
+
+
+def _delivered(destination):
+    return sorted(row["i"] for row in destination.rows)
+
+
+def test_rows_spooled_during_an_outage_are_replayed_after_recovery(tmp_path):
+    destination = FlakyDestination()
+    sink = _sink(tmp_path, destination)
+
+    destination.up = False
+    sink._write([{"i": 0}, {"i": 1}])
+    destination.up = True
+    sink._write([{"i": 2}])
+
+    assert _delivered(destination) == [0, 1, 2]
+    assert sink._segments() == []
+    assert not os.path.exists(sink.spool_path)
+
+
+def test_rejected_row_is_dead_lettered_and_the_rest_delivered(tmp_path):
+    destination = FlakyDestination()
+    sink = _sink(tmp_path, destination, max_batch_size=2, max_replay_attempts=2)
+
+    destination.up = False
+    sink._write([{"i": 0}, {"i": 1, "bad": True}, {"i": 2}])
+    destination.up = True
+    for n in range(4):
+        sink._write([{"i": 10 + n}])
+
+    assert _delivered(destination) == [0, 2, 10, 11, 12, 13]
+    with open(sink.dead_letter_path) as f:
+        dead = [json.loads(line) for line in f]
+    assert [record["row"]["i"] for record in dead] == [1]
+    assert sink._segments() == []
+    assert not os.path.exists(sink.spool_path)
+
+
+def test_replay_is_capped_per_flush(tmp_path):
+    destination = FlakyDestination()
+    sink = _sink(tmp_path, destination, max_batch_size=10, max_replay_rows=3)
+
+    destination.up = False
+    sink._write([{"i": i} for i in range(7)])
+    destination.up = True
+
+    sink._write([{"i": 100}])
+    assert _delivered(destination) == [0, 1, 2, 100]
+    sink._write([{"i": 101}])
+    assert _delivered(destination) == [0, 1, 2, 3, 4, 5, 100, 101]
+    sink._write([{"i": 102}])
+    assert _delivered(destination) == [0, 1, 2, 3, 4, 5, 6, 100, 101, 102]
+
+
+def test_replay_resumes_from_saved_offset_after_restart(tmp_path):
+    destination = FlakyDestination()
+    sink = _sink(tmp_path, destination, max_batch_size=2, max_replay_rows=2)
+
+    destination.up = False
+    sink._write([{"i": i} for i in range(5)])
+    destination.up = True
+    sink._write([{"i": 100}])
+
+    # A new process picks up where the last one stopped, without resending
+    restarted = _sink(tmp_path, destination, max_batch_size=2, max_replay_rows=10)
+    restarted._write([{"i": 101}])
+
+    assert _delivered(destination) == [0, 1, 2, 3, 4, 100, 101]
+
+
+def test_leftover_replay_file_is_recovered_on_startup(tmp_path):
+    spool_path = tmp_path / "spool.jsonl"
+    with open(f"{spool_path}.replay", "w") as f:
+        f.write(json.dumps({"i": 0}) + "\n")
+        f.write(json.dumps({"attempts": 1, "row": {"i": 1}}) + "\n")
+    destination = FlakyDestination()
+
+    sink = _sink(tmp_path, destination)
+    sink._write([{"i": 2}])
+
+    assert _delivered(destination) == [0, 1, 2]
+    assert not os.path.exists(f"{spool_path}.replay")
+
+
+def test_put_and_close_flush_everything(tmp_path):
+    destination = FlakyDestination()
+
+    async def main():
+        sink = _sink(tmp_path, destination, max_batch_size=3, flush_interval=0.01)
+        for i in range(10):
+            await sink.put({"i": i})
+        await sink.close()
+
+    asyncio.run(main())
+
+    assert _delivered(destination) == list(range(10))
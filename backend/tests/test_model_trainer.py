@@ -0,0 +1,121 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+pytest.importorskip("sklearn")
+pytest.importorskip("google.cloud.bigquery")
+pytest.importorskip("mlflow")
+
+from app.ml.feature_engineering import TEXT_ROW, FeatureEngineeringPipeline
+from app.ml.model_trainer import ModelTrainer
+
+
+def _pipeline() -> FeatureEngineeringPipeline:
+    pipeline = FeatureEngineeringPipeline.__new__(FeatureEngineeringPipeline)
+    pipeline.config = {}
+    # Two products plus the trailing empty row
+    pipeline.text_features = sparse.csr_matrix(
+        np.array([[0.5, 0.0], [0.0, 0.25], [0.0, 0.0]], dtype=np.float32)
+    )
+    return pipeline
+
+
+def _features() -> pd.DataFrame:
+    return pd.DataFrame({
+        "user_id": [1, 2, 3, 4],
+        "product_id": [10, 11, 10, 99],
+        "hour_of_day": [1, 2, 3, 4],
+        "interaction_view": [True, False, True, False],
+        "price": [9.5, 3.0, 9.5, np.nan],
+        TEXT_ROW: [0, 1, 0, np.nan]
+    })
+
+
+def test_feature_matrix_drops_ids_and_text_row_and_appends_text_columns():
+    pipeline = _pipeline()
+    features = _features()
+
+    matrix = pipeline.feature_matrix(features)
+
+    assert pipeline.feature_names(features) == [
+        "hour_of_day", "interaction_view", "price", "text_feature_0", "text_feature_1"
+    ]
+    assert sparse.isspmatrix_csr(matrix)
+    assert matrix.shape == (4, 5)
+    np.testing.assert_allclose(matrix[:, 3:].toarray(), [[0.5, 0], [0, 0.25], [0.5, 0], [0, 0]])
+
+
+def test_trainer_trains_on_the_pipeline_feature_matrix():
+    trainer = ModelTrainer.__new__(ModelTrainer)
+    trainer.feature_pipeline = _pipeline()
+    seen = {}
+
+    async def create_feature_set(**kwargs):
+        return _features()
+
+    async def train_model_by_type(model_type, train_data, val_data, training_config):
+        seen["train"], seen["val"] = train_data, val_data
+        return "model", {"loss": 0.1}
+
+    class Registry:
+        async def register_model(self, **kwargs):
+            seen["artifacts"] = kwargs["model_artifacts"]
+            return "v1"
+
+    async def log_training_metrics(*args):
+        pass
+
+    trainer.feature_pipeline.create_feature_set = create_feature_set
+    trainer._train_model_by_type = train_model_by_type
+    trainer._log_training_metrics = log_training_metrics
+    trainer.model_registry = Registry()
+
+    version = asyncio.run(trainer.train_model("recommender", "mlp", {
+        "start_date": None,
+        "end_date": None,
+        "validation_split": 0.25
+    }))
+
+    assert version == "v1"
+    assert seen["train"].shape == (3, 5) and seen["val"].shape == (1, 5)
+    assert seen["artifacts"]["feature_columns"] == [
+        "hour_of_day", "interaction_view", "price", "text_feature_0", "text_feature_1"
+    ]
+    assert TEXT_ROW not in seen["artifacts"]["feature_columns"]
+
+
+def test_streamed_training_matrix_reads_interactions_once_and_is_scaled():
+    pipeline = _pipeline()
+    pipeline.config = {"streaming_extraction": True}
+    passes, written = [], []
+
+    async def load_stream_inputs(start_date, end_date):
+        return {}
+
+    async def iter_features(inputs):
+        passes.append(1)
+        features = _features()
+        yield features.iloc[:2].copy()
+        yield features.iloc[2:].copy()
+
+    async def save_feature_chunks(feature_set_name, chunks):
+        async for chunk in chunks:
+            written.append(chunk)
+
+    pipeline._load_stream_inputs = load_stream_inputs
+    pipeline._iter_features = iter_features
+    pipeline._save_feature_chunks = save_feature_chunks
+
+    matrix, columns = asyncio.run(pipeline.create_training_matrix("set", None, None))
+
+    assert len(passes) == 1
+    # Chunks are written unscaled
+    assert pd.concat(written)["hour_of_day"].tolist() == [1, 2, 3, 4]
+    assert columns == pipeline.feature_names(_features())
+    hour = matrix[:, columns.index("hour_of_day")].toarray().ravel()
+    np.testing.assert_allclose(hour.mean(), 0.0, atol=1e-6)
+    np.testing.assert_allclose(hour.std(), 1.0, atol=1e-5)
+    np.testing.assert_allclose(matrix[:, 3:].toarray(), [[0.5, 0], [0, 0.25], [0.5, 0], [0, 0]])
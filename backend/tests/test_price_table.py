@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+from app.ml.price_table import PriceTable
+
+
+def _entry(price: float, hours: float = 1) -> dict:
+    return {"price": price, "valid_until": datetime.now() + timedelta(hours=hours)}
+
+
+def test_lookup_returns_a_copy_and_skips_expired_entries():
+    table = PriceTable()
+    table.swap({("a", "default"): _entry(10.0), ("b", "default"): _entry(5.0, hours=-1)})
+
+    found = table.lookup("a", "default")
+    found["price"] = 0.0
+
+    assert table.lookup("a", "default")["price"] == 10.0
+    assert table.lookup("b", "default") is None
+    assert table.lookup("a", "vip") is None
+
+
+def test_evict_drops_every_segment_of_one_product():
+    table = PriceTable()
+    table.swap({
+        ("a", "default"): _entry(10.0),
+        ("a", "vip"): _entry(9.0),
+        ("b", "default"): _entry(5.0)
+    })
+
+    table.evict("a")
+
+    assert table.lookup("a", "default") is None
+    assert table.lookup("a", "vip") is None
+    assert table.lookup("b", "default")["price"] == 5.0
+
+
+def test_clear_and_merge_swap():
+    table = PriceTable()
+    table.swap({("a", "default"): _entry(10.0)})
+    table.swap({("b", "default"): _entry(5.0)}, merge=True)
+    assert len(table) == 2
+
+    table.clear()
+
+    assert len(table) == 0
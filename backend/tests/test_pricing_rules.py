@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from app.ml.pricing_rules import CompiledPricingRules
+
+
+def _constraints(cost: float = 50.0, original_price: float = 100.0) -> dict:
+    return {
+        "cost": cost,
+        "min_margin": 0.1,
+        "max_discount": 0.3,
+        "original_price": original_price
+    }
+
+
+def test_apply_clamps_to_rules_then_constraints():
+    rules = CompiledPricingRules.from_records(
+        {"a": _constraints(), "b": _constraints(), "c": _constraints()},
+        {"b": {"max_price": 90.0}, "c": {"min_price": 120.0}}
+    )
+
+    result = rules.apply(["a", "b", "c"], np.array([10.0, 95.0, 100.0]))
+
+    # a: max discount 30% beats the 55.0 margin floor; b: capped by the rule;
+    # c: raised to the rule's minimum
+    np.testing.assert_allclose(result["price"], [70.0, 90.0, 120.0])
+    np.testing.assert_allclose(result["discount_percentage"], [30.0, 10.0, -20.0])
+    assert result["reason"][0] == "Demand optimization"
+    assert result["reason"][2] == "Market conditions"
+
+
+def test_apply_rejects_unknown_products():
+    rules = CompiledPricingRules.from_records({"a": _constraints()}, {})
+
+    assert rules.missing(["a", "new"]) == ["new"]
+    with pytest.raises(ValueError):
+        rules.apply(["new"], np.array([100.0]))
+
+
+def test_extend_adds_rows_and_keeps_existing_ones():
+    rules = CompiledPricingRules.from_records({"a": _constraints()}, {})
+
+    extended = rules.extend(
+        {"a": _constraints(cost=1.0), "new": _constraints(original_price=200.0)},
+        {"new": {"max_price": 180.0}}
+    )
+
+    assert "new" not in rules
+    assert len(extended) == 2
+    assert extended.loaded_at == rules.loaded_at
+    result = extended.apply(["new", "a"], np.array([250.0, 10.0]))
+    np.testing.assert_allclose(result["price"], [180.0, 70.0])
+    assert extended.extend({"a": _constraints()}, {}) is extended
@@ -0,0 +1,102 @@
+import numpy as np
+
+from app.ml.replay_buffer import PrioritizedReplayBuffer, ReplayBuffer, SumTree
+
+
+def _transitions(n: int, state_dim: int = 3):
+    states = np.arange(n * state_dim, dtype=np.float32).reshape(n, state_dim)
+    return (
+        states,
+        np.arange(n, dtype=np.int64),
+        np.arange(n, dtype=np.float32),
+        states + 1,
+        np.zeros(n, dtype=np.float32)
+    )
+
+
+def test_sum_tree_totals_and_finds_the_covering_leaf():
+    tree = SumTree(5)
+    tree.update(np.arange(5), np.array([1.0, 2.0, 3.0, 4.0, 0.0]))
+
+    assert tree.n_leaves == 8
+    assert tree.total == 10.0
+    # Cumulative bounds are 1, 3, 6, 10
+    found = tree.find(np.array([0.5, 1.0, 1.5, 3.0, 5.9, 6.5, 9.99]))
+    assert found.tolist() == [0, 0, 1, 1, 2, 3, 3]
+
+    tree.update(np.array([3]), np.array([0.0]))
+    assert tree.total == 6.0
+    np.testing.assert_array_equal(tree.leaves(np.arange(4)), [1.0, 2.0, 3.0, 0.0])
+
+
+def test_sum_tree_single_leaf():
+    tree = SumTree(1)
+    tree.update(np.array([0]), np.array([2.5]))
+
+    assert tree.total == 2.5
+    assert tree.find(np.array([1.0])).tolist() == [0]
+
+
+def test_prioritized_sampling_follows_priorities():
+    buffer = PrioritizedReplayBuffer(4, state_dim=3, alpha=1.0, epsilon=0.0, seed=0)
+    buffer.add_batch(*_transitions(4))
+    buffer.update_priorities(np.arange(4), np.array([1.0, 0.0, 3.0, 6.0]))
+
+    counts = np.zeros(4)
+    for _ in range(200):
+        counts += np.bincount(buffer.sample(50)["indices"], minlength=4)
+
+    np.testing.assert_allclose(counts / counts.sum(), [0.1, 0.0, 0.3, 0.6], atol=0.02)
+
+
+def test_prioritized_weights_favour_rare_transitions():
+    buffer = PrioritizedReplayBuffer(4, state_dim=3, alpha=1.0, beta=1.0, epsilon=0.0, seed=0)
+    buffer.add_batch(*_transitions(4))
+    buffer.update_priorities(np.arange(4), np.array([1.0, 1.0, 1.0, 7.0]))
+
+    batch = buffer.sample(64)
+
+    assert batch["weights"].max() == 1.0
+    assert np.all(batch["weights"][batch["indices"] == 3] < batch["weights"].max())
+    np.testing.assert_array_equal(batch["actions"], batch["indices"])
+
+
+def test_new_transitions_get_the_maximum_priority():
+    buffer = PrioritizedReplayBuffer(4, state_dim=3, alpha=1.0, epsilon=0.0, seed=0)
+    buffer.add_batch(*_transitions(2))
+    buffer.update_priorities(np.array([0, 1]), np.array([5.0, 1.0]))
+
+    slot = buffer.add(np.zeros(3), 9, 0.0, np.zeros(3), False)
+
+    assert buffer.tree.leaves(np.array([slot]))[0] == 5.0
+
+
+def test_add_batch_wraps_and_keeps_the_newest_rows():
+    buffer = ReplayBuffer(4, state_dim=3, seed=0)
+    buffer.add_batch(*_transitions(3))
+    slots = buffer.add_batch(*(field[:3] + 10 for field in _transitions(3)))
+
+    assert len(buffer) == 4
+    assert slots.tolist() == [3, 0, 1]
+    assert buffer.actions.tolist() == [11, 12, 2, 10]
+
+    buffer = ReplayBuffer(4, state_dim=3)
+    slots = buffer.add_batch(*_transitions(6))
+    assert sorted(buffer.actions.tolist()) == [2, 3, 4, 5]
+    assert len(slots) == 4
+
+
+def test_save_and_load_round_trip(tmp_path):
+    buffer = PrioritizedReplayBuffer(8, state_dim=3, seed=0)
+    buffer.add_batch(*_transitions(5))
+    buffer.update_priorities(np.arange(5), np.array([0.1, 0.2, 0.3, 4.0, 0.5]))
+    path = str(tmp_path / "buffer.npz")
+    buffer.save(path)
+
+    restored = PrioritizedReplayBuffer(8, state_dim=3, seed=0)
+    restored.load(path)
+
+    assert len(restored) == 5
+    assert restored.max_priority == buffer.max_priority
+    np.testing.assert_array_equal(restored.tree.tree, buffer.tree.tree)
+    np.testing.assert_array_equal(restored.states, buffer.states)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from app.ml.topk import StreamingTopK, top_k
+
+
+@pytest.mark.parametrize("k", [1, 5, 100, 1000])
+def test_top_k_matches_full_sort(k):
+    scores = np.random.default_rng(0).normal(size=1000).astype(np.float32)
+
+    expected = np.argsort(-scores, kind="stable")[:k]
+
+    np.testing.assert_array_equal(top_k(scores, k), expected)
+
+
+def test_top_k_handles_empty_and_oversized_k():
+    assert len(top_k(np.array([]), 3)) == 0
+    assert len(top_k(np.array([1.0, 2.0]), 0)) == 0
+    np.testing.assert_array_equal(top_k(np.array([1.0, 3.0, 2.0]), 10), [1, 2, 0])
+
+
+def test_streaming_top_k_matches_top_k_over_all_chunks():
+    scores = np.random.default_rng(1).normal(size=10_000).astype(np.float32)
+    streaming = StreamingTopK(25)
+    for start in range(0, len(scores), 999):
+        streaming.push(scores[start:start + 999])
+
+    indices, top_scores = streaming.result()
+
+    np.testing.assert_array_equal(indices, top_k(scores, 25))
+    np.testing.assert_array_equal(top_scores, scores[indices])
+
+
+def test_streaming_top_k_uses_given_indices():
+    streaming = StreamingTopK(2)
+    streaming.push(np.array([0.1, 0.9]), indices=np.array([40, 41]))
+    streaming.push(np.array([0.5, 0.95]), indices=np.array([7, 8]))
+
+    indices, scores = streaming.result()
+
+    assert indices.tolist() == [8, 41]
+    np.testing.assert_allclose(scores, [0.95, 0.9])
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from sklearn.ensemble import GradientBoostingRegressor
+
+from app.ml.tree_export import FlatTreeEnsemble
+
+
+def _fitted_model(**kwargs) -> GradientBoostingRegressor:
+    """Same hyperparameters as DynamicPricingEngine._build_elasticity_model."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 12))
+    y = -1.5 * X[:, 0] + np.sin(X[:, 1]) + 0.3 * X[:, 2] * X[:, 3] + rng.normal(scale=0.1, size=2000)
+
+    params = {"n_estimators": 100, "learning_rate": 0.1, "max_depth": 3, **kwargs}
+    return GradientBoostingRegressor(**params).fit(X, y)
+
+
+@pytest.mark.parametrize("n_rows", [1, 1000])
+def test_flat_ensemble_matches_sklearn(n_rows):
+    model = _fitted_model()
+    X = np.random.default_rng(1).normal(size=(n_rows, 12))
+
+    np.testing.assert_allclose(
+        FlatTreeEnsemble.from_sklearn(model).predict(X),
+        model.predict(X),
+        rtol=1e-9,
+        atol=1e-9
+    )
+
+
+def test_flat_ensemble_matches_sklearn_on_thresholds():
+    model = _fitted_model()
+    tree = model.estimators_[0, 0].tree_
+    split = tree.children_left != -1
+
+    # Rows sitting exactly on split thresholds exercise the <= boundary
+    X = np.zeros((split.sum(), 12))
+    X[np.arange(split.sum()), tree.feature[split]] = tree.threshold[split]
+
+    np.testing.assert_allclose(
+        FlatTreeEnsemble.from_sklearn(model).predict(X),
+        model.predict(X),
+        rtol=1e-9,
+        atol=1e-9
+    )
+
+
+def test_flat_ensemble_supports_zero_init():
+    model = _fitted_model(init="zero", n_estimators=20)
+    X = np.random.default_rng(2).normal(size=(50, 12))
+
+    np.testing.assert_allclose(
+        FlatTreeEnsemble.from_sklearn(model).predict(X),
+        model.predict(X),
+        rtol=1e-9,
+        atol=1e-9
+    )
+
+
+def test_unfitted_model_is_rejected():
+    with pytest.raises(ValueError):
+        FlatTreeEnsemble.from_sklearn(GradientBoostingRegressor())
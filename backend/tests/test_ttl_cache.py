@@ -0,0 +1,93 @@
+import asyncio
+
+from app.ml.ttl_cache import TTLCache
+
+
+def test_get_or_fetch_caches_none_results():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return None
+
+    async def main():
+        cache = TTLCache(ttl_seconds=60)
+        first = await cache.get_or_fetch("missing", fetch)
+        second = await cache.get_or_fetch("missing", fetch)
+        return first, second
+
+    assert asyncio.run(main()) == (None, None)
+    assert len(calls) == 1
+
+
+def test_concurrent_misses_share_one_fetch():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        cache = TTLCache(ttl_seconds=60)
+        return await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["value"] * 10
+    assert len(calls) == 1
+
+
+def test_failed_fetch_is_not_cached():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("db down")
+        return "value"
+
+    async def main():
+        cache = TTLCache(ttl_seconds=60)
+        try:
+            await cache.get_or_fetch("k", fetch)
+        except ConnectionError:
+            pass
+        return await cache.get_or_fetch("k", fetch)
+
+    assert asyncio.run(main()) == "value"
+    assert len(calls) == 2
+
+
+def test_invalidate_during_fetch_drops_its_result():
+    async def main():
+        cache = TTLCache(ttl_seconds=60)
+        started = asyncio.Event()
+
+        async def slow_fetch():
+            started.set()
+            await asyncio.sleep(0.01)
+            return "stale"
+
+        pending = asyncio.ensure_future(cache.get_or_fetch("k", slow_fetch))
+        await started.wait()
+        cache.invalidate("k")
+        assert await pending == "stale"
+
+        async def fresh_fetch():
+            return "fresh"
+
+        return await cache.get_or_fetch("k", fresh_fetch)
+
+    assert asyncio.run(main()) == "fresh"
+
+
+def test_entries_expire_and_lru_is_bounded():
+    cache = TTLCache(ttl_seconds=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+    cache = TTLCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache and "c" in cache and "b" not in cache